@@ -6,18 +6,32 @@ Flask + D3.js dashboard for visualizing gene-trait networks, candidate gene pred
 and breeding decision support tools.
 """
 
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, render_template, request, jsonify, session, g, stream_with_context
 from flask_cors import CORS
 import pandas as pd
-import numpy as np
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import threading
+from urllib.parse import urlencode
+from functools import wraps
+from typing import Dict, List, Optional, Any, Tuple, Iterator, Iterable
+from dataclasses import dataclass
 from neo4j import GraphDatabase
 import networkx as nx
 from datetime import datetime, timedelta
 import os
+import sys
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+import dashboard_cache
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -28,7 +42,10 @@ app = Flask(__name__)
 app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key-change-in-production')
 CORS(app)
 
-@dataclass
+# Slotted dataclasses (Python 3.10+) drop the per-instance __dict__
+_DATACLASS_OPTIONS = {'slots': True, 'frozen': True} if sys.version_info >= (3, 10) else {'frozen': True}
+
+@dataclass(**_DATACLASS_OPTIONS)
 class NetworkNode:
     """Represents a node in the gene-trait network"""
     id: str
@@ -37,8 +54,14 @@ class NetworkNode:
     properties: Dict[str, Any]
     x: Optional[float] = None
     y: Optional[float] = None
+    
+    _FIELDS = ('id', 'label', 'type', 'properties', 'x', 'y')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict view for serialization (avoids asdict's deep copy)"""
+        return {name: getattr(self, name) for name in self._FIELDS}
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class NetworkEdge:
     """Represents an edge in the gene-trait network"""
     source: str
@@ -46,8 +69,14 @@ class NetworkEdge:
     type: str
     weight: float
     properties: Dict[str, Any]
+    
+    _FIELDS = ('source', 'target', 'type', 'weight', 'properties')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict view for serialization (avoids asdict's deep copy)"""
+        return {name: getattr(self, name) for name in self._FIELDS}
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class CandidateGene:
     """Represents a candidate gene prediction"""
     gene_id: str
@@ -59,118 +88,220 @@ class CandidateGene:
     evidence: List[str]
     chromosome: Optional[str] = None
     position: Optional[int] = None
+    
+    _FIELDS = ('gene_id', 'gene_name', 'trait_id', 'trait_name', 'prediction_score',
+               'confidence', 'evidence', 'chromosome', 'position')
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dict view for serialization (avoids asdict's deep copy)"""
+        return {name: getattr(self, name) for name in self._FIELDS}
+
+# Parameterized so the planner compiles each query once and reuses the plan
+_NETWORK_QUERY = """
+MATCH (g:Gene)-[r:REGULATES|INFLUENCES|ASSOCIATED_WITH]->(t:Trait)
+WHERE ($trait_filter IS NULL OR t.name CONTAINS $trait_filter)
+WITH g, r, t
+LIMIT $max_nodes
+RETURN coalesce(g.gene_id, g.name) as gene_id,
+       coalesce(g.symbol, g.name) as gene_label,
+       g.chromosome as gene_chr,
+       g.start_pos as gene_pos,
+       coalesce(g.description, '') as gene_description,
+       coalesce(g.biotype, 'protein_coding') as gene_biotype,
+       coalesce(t.trait_id, t.name) as trait_id,
+       t.name as trait_label,
+       t.category as trait_category,
+       coalesce(t.unit, '') as trait_unit,
+       t.heritability as trait_heritability,
+       coalesce(t.description, '') as trait_description,
+       type(r) as rel_type,
+       r.effect_size as effect_size,
+       coalesce(r.confidence, 0.5) as confidence,
+       coalesce(r.evidence_type, 'computational') as evidence_type,
+       coalesce(r.publication, '') as publication
+"""
+
+_PERFORMANCE_QUERY = """
+MATCH (germ:Germplasm)-[:MEASURED_IN]->(m:Measurement)-[:MEASURES]->(t:Trait)
+MATCH (germ)-[:TESTED_IN]->(trial:Trial)-[:CONDUCTED_IN]->(e:Environment)
+WHERE t.name CONTAINS $trait_name
+  AND ($environment IS NULL OR e.location CONTAINS $environment)
+RETURN germ.name as germplasm,
+       avg(toFloat(m.value)) as avg_value,
+       count(m) as num_measurements,
+       e.location as location,
+       trial.year as year
+ORDER BY avg_value DESC
+LIMIT 50
+"""
+
+_CANDIDATES_QUERY = """
+MATCH (g:Gene)-[r:REGULATES|INFLUENCES|ASSOCIATED_WITH]->(t:Trait)
+WHERE t.name CONTAINS $trait_name
+WITH g, r, t,
+     coalesce(r.effect_size, 0.5) * coalesce(r.confidence, 0.5) as score
+ORDER BY score DESC
+LIMIT $top_k
+RETURN g.gene_id as gene_id,
+       g.symbol as gene_name,
+       t.trait_id as trait_id,
+       t.name as trait_name,
+       score as prediction_score,
+       r.confidence as confidence,
+       g.chromosome as chromosome,
+       g.start_pos as position,
+       r.evidence_type as evidence_type
+"""
+
+# Pearson r is reduced inside the database so only scalars cross the wire
+_CORRELATIONS_QUERY = """
+MATCH (germ:Germplasm)-[:MEASURED_IN]->(m1:Measurement)-[:MEASURES]->(t1:Trait)
+MATCH (germ)-[:MEASURED_IN]->(m2:Measurement)-[:MEASURES]->(t2:Trait)
+WHERE t1.name CONTAINS $trait_name AND t1 <> t2
+WITH t1.name as trait1, t2.name as trait2,
+     toFloat(m1.value) as x, toFloat(m2.value) as y
+WHERE x IS NOT NULL AND y IS NOT NULL
+WITH trait1, trait2, count(*) as n,
+     sum(x) as sx, sum(y) as sy, sum(x * y) as sxy,
+     sum(x * x) as sxx, sum(y * y) as syy
+WHERE n >= 10
+WITH trait1, trait2, n, n * sxy - sx * sy as cov,
+     (n * sxx - sx * sx) * (n * syy - sy * sy) as var_product
+WHERE var_product > 0
+RETURN trait1, trait2, n, cov / sqrt(var_product) as correlation
+LIMIT 20
+"""
+
+# Label-specific branches let each side use its own (text) index
+_SEARCH_QUERY = """
+CALL {
+    MATCH (n:Gene)
+    WHERE n.name CONTAINS $query OR n.symbol CONTAINS $query
+    RETURN n
+    UNION
+    MATCH (n:Trait)
+    WHERE n.name CONTAINS $query
+    RETURN n
+}
+RETURN n.name as name,
+       n.symbol as symbol,
+       labels(n)[0] as type,
+       n.description as description
+LIMIT 20
+"""
 
 class KnowledgeGraphAPI:
     """API interface to the knowledge graph"""
     
     def __init__(self, neo4j_uri: str, username: str, password: str):
-        self.driver = GraphDatabase.driver(neo4j_uri, auth=(username, password))
+        self.driver = GraphDatabase.driver(
+            neo4j_uri,
+            auth=(username, password),
+            max_connection_pool_size=int(os.environ.get('NEO4J_MAX_POOL_SIZE', 50)),
+            connection_acquisition_timeout=30,
+            # Dashboard queries return tens of rows; smaller pulls start responses sooner
+            fetch_size=int(os.environ.get('NEO4J_FETCH_SIZE', 200))
+        )
+        # Fan-out pool for independent panel queries; each task uses its own pooled session
+        self._executor = ThreadPoolExecutor(
+            max_workers=int(os.environ.get('DASHBOARD_QUERY_WORKERS', 8)),
+            thread_name_prefix='kg-query'
+        )
+    
+    def warm_query_plans(self):
+        """Compile every dashboard query plan with EXPLAIN before serving traffic"""
+        dummy_params = [
+            (_NETWORK_QUERY, {'trait_filter': None, 'max_nodes': 1}),
+            (_CANDIDATES_QUERY, {'trait_name': '', 'top_k': 1}),
+            (_PERFORMANCE_QUERY, {'trait_name': '', 'environment': None}),
+            (_CORRELATIONS_QUERY, {'trait_name': ''}),
+            (_SEARCH_QUERY, {'query': ''}),
+        ]
+        try:
+            with self.driver.session() as session:
+                for query, params in dummy_params:
+                    session.run("EXPLAIN " + query, **params).consume()
+            logger.info(f"Warmed {len(dummy_params)} query plans")
+        except Exception as e:
+            logger.warning(f"Query plan warmup skipped: {e}")
+    
+    @contextmanager
+    def _session(self, session=None):
+        """Yield the caller's session, or open (and close) a fresh one"""
+        if session is not None:
+            yield session
+        else:
+            with self.driver.session() as new_session:
+                yield new_session
     
     def get_gene_trait_network(self, trait_filter: Optional[str] = None, 
-                              max_nodes: int = 100) -> Tuple[List[NetworkNode], List[NetworkEdge]]:
+                              max_nodes: int = 100,
+                              session=None) -> Tuple[List[NetworkNode], List[NetworkEdge]]:
         """Get gene-trait network data for visualization"""
         
-        # Build query based on filters
-        where_clause = ""
-        if trait_filter:
-            where_clause = f"WHERE t.name CONTAINS '{trait_filter}'"
-        
-        query = f"""
-        MATCH (g:Gene)-[r:REGULATES|INFLUENCES|ASSOCIATED_WITH]->(t:Trait)
-        {where_clause}
-        WITH g, r, t
-        LIMIT {max_nodes}
-        RETURN g, r, t,
-               g.chromosome as gene_chr,
-               g.start_pos as gene_pos,
-               t.category as trait_category,
-               r.effect_size as effect_size
-        """
-        
-        nodes = []
+        # Keyed by node id: doubles as the dedup index and preserves insertion order
+        nodes_by_id: Dict[str, NetworkNode] = {}
         edges = []
-        node_ids = set()
         
-        with self.driver.session() as session:
-            result = session.run(query)
+        with self._session(session) as session:
+            result = session.run(_NETWORK_QUERY,
+                                 trait_filter=trait_filter or None,
+                                 max_nodes=max_nodes)
             
             for record in result:
-                gene = record['g']
-                trait = record['t']
-                relationship = record['r']
-                
                 # Add gene node
-                gene_id = gene['gene_id'] if 'gene_id' in gene else gene['name']
-                if gene_id not in node_ids:
-                    nodes.append(NetworkNode(
+                gene_id = record['gene_id']
+                if gene_id not in nodes_by_id:
+                    nodes_by_id[gene_id] = NetworkNode(
                         id=gene_id,
-                        label=gene.get('symbol', gene.get('name', gene_id)),
+                        label=record['gene_label'] or gene_id,
                         type='gene',
                         properties={
-                            'chromosome': record.get('gene_chr'),
-                            'position': record.get('gene_pos'),
-                            'description': gene.get('description', ''),
-                            'biotype': gene.get('biotype', 'protein_coding')
+                            'chromosome': record['gene_chr'],
+                            'position': record['gene_pos'],
+                            'description': record['gene_description'],
+                            'biotype': record['gene_biotype']
                         }
-                    ))
-                    node_ids.add(gene_id)
+                    )
                 
                 # Add trait node
-                trait_id = trait['trait_id'] if 'trait_id' in trait else trait['name']
-                if trait_id not in node_ids:
-                    nodes.append(NetworkNode(
+                trait_id = record['trait_id']
+                if trait_id not in nodes_by_id:
+                    nodes_by_id[trait_id] = NetworkNode(
                         id=trait_id,
-                        label=trait.get('name', trait_id),
+                        label=record['trait_label'] or trait_id,
                         type='trait',
                         properties={
-                            'category': record.get('trait_category', 'phenotypic'),
-                            'unit': trait.get('unit', ''),
-                            'heritability': trait.get('heritability'),
-                            'description': trait.get('description', '')
+                            'category': record['trait_category'],
+                            'unit': record['trait_unit'],
+                            'heritability': record['trait_heritability'],
+                            'description': record['trait_description']
                         }
-                    ))
-                    node_ids.add(trait_id)
+                    )
                 
                 # Add edge
                 edges.append(NetworkEdge(
                     source=gene_id,
                     target=trait_id,
-                    type=relationship.type,
-                    weight=record.get('effect_size', 1.0),
+                    type=record['rel_type'],
+                    weight=record['effect_size'],
                     properties={
-                        'confidence': relationship.get('confidence', 0.5),
-                        'evidence_type': relationship.get('evidence_type', 'computational'),
-                        'publication': relationship.get('publication', '')
+                        'confidence': record['confidence'],
+                        'evidence_type': record['evidence_type'],
+                        'publication': record['publication']
                     }
                 ))
         
-        return nodes, edges
+        return list(nodes_by_id.values()), edges
     
-    def get_candidate_genes(self, trait_name: str, top_k: int = 20) -> List[CandidateGene]:
+    def get_candidate_genes(self, trait_name: str, top_k: int = 20,
+                            session=None) -> List[CandidateGene]:
         """Get candidate genes for a specific trait"""
         
-        query = """
-        MATCH (g:Gene)-[r:REGULATES|INFLUENCES|ASSOCIATED_WITH]->(t:Trait)
-        WHERE t.name CONTAINS $trait_name
-        WITH g, r, t, 
-             coalesce(r.effect_size, 0.5) * coalesce(r.confidence, 0.5) as score
-        ORDER BY score DESC
-        LIMIT $top_k
-        RETURN g.gene_id as gene_id,
-               g.symbol as gene_name,
-               t.trait_id as trait_id,
-               t.name as trait_name,
-               score as prediction_score,
-               r.confidence as confidence,
-               g.chromosome as chromosome,
-               g.start_pos as position,
-               r.evidence_type as evidence_type
-        """
-        
         candidates = []
         
-        with self.driver.session() as session:
-            result = session.run(query, trait_name=trait_name, top_k=top_k)
+        with self._session(session) as session:
+            result = session.run(_CANDIDATES_QUERY, trait_name=trait_name, top_k=top_k)
             
             for record in result:
                 candidates.append(CandidateGene(
@@ -187,84 +318,62 @@ class KnowledgeGraphAPI:
         
         return candidates
     
-    def get_germplasm_performance(self, trait_name: str, environment: Optional[str] = None) -> List[Dict]:
-        """Get germplasm performance data for a trait"""
-        
-        env_filter = ""
-        if environment:
-            env_filter = "AND e.location CONTAINS $environment"
-        
-        query = f"""
-        MATCH (germ:Germplasm)-[:MEASURED_IN]->(m:Measurement)-[:MEASURES]->(t:Trait)
-        MATCH (germ)-[:TESTED_IN]->(trial:Trial)-[:CONDUCTED_IN]->(e:Environment)
-        WHERE t.name CONTAINS $trait_name {env_filter}
-        RETURN germ.name as germplasm,
-               avg(toFloat(m.value)) as avg_value,
-               count(m) as num_measurements,
-               e.location as location,
-               trial.year as year
-        ORDER BY avg_value DESC
-        LIMIT 50
-        """
-        
-        params = {'trait_name': trait_name}
-        if environment:
-            params['environment'] = environment
+    def iter_germplasm_performance(self, trait_name: str, environment: Optional[str] = None,
+                                   session=None) -> Iterator[Dict]:
+        """Yield germplasm performance rows for a trait as the driver fetches them"""
         
-        performance_data = []
-        
-        with self.driver.session() as session:
-            result = session.run(query, **params)
+        with self._session(session) as session:
+            result = session.run(_PERFORMANCE_QUERY,
+                                 trait_name=trait_name,
+                                 environment=environment or None)
             
             for record in result:
-                performance_data.append({
+                yield {
                     'germplasm': record['germplasm'],
                     'avg_value': record['avg_value'],
                     'num_measurements': record['num_measurements'],
                     'location': record['location'],
                     'year': record['year']
-                })
-        
-        return performance_data
+                }
+    
+    def get_germplasm_performance(self, trait_name: str, environment: Optional[str] = None,
+                                  session=None) -> List[Dict]:
+        """Get germplasm performance data for a trait"""
+        return list(self.iter_germplasm_performance(trait_name, environment, session=session))
     
-    def get_trait_correlations(self, trait_name: str) -> List[Dict]:
+    def get_trait_correlations(self, trait_name: str, session=None) -> List[Dict]:
         """Get trait correlations for breeding insights"""
         
-        query = """
-        MATCH (germ:Germplasm)-[:MEASURED_IN]->(m1:Measurement)-[:MEASURES]->(t1:Trait)
-        MATCH (germ)-[:MEASURED_IN]->(m2:Measurement)-[:MEASURES]->(t2:Trait)
-        WHERE t1.name CONTAINS $trait_name AND t1 <> t2
-        WITH t1.name as trait1, t2.name as trait2,
-             collect([toFloat(m1.value), toFloat(m2.value)]) as value_pairs
-        WHERE size(value_pairs) >= 10
-        RETURN trait1, trait2, value_pairs
-        LIMIT 20
-        """
-        
         correlations = []
         
-        with self.driver.session() as session:
-            result = session.run(query, trait_name=trait_name)
+        with self._session(session) as session:
+            result = session.run(_CORRELATIONS_QUERY, trait_name=trait_name)
             
             for record in result:
-                # Calculate correlation coefficient
-                pairs = record['value_pairs']
-                if len(pairs) >= 10:
-                    x_vals = [pair[0] for pair in pairs if pair[0] is not None and pair[1] is not None]
-                    y_vals = [pair[1] for pair in pairs if pair[0] is not None and pair[1] is not None]
-                    
-                    if len(x_vals) >= 10:
-                        correlation = np.corrcoef(x_vals, y_vals)[0, 1]
-                        
-                        correlations.append({
-                            'trait1': record['trait1'],
-                            'trait2': record['trait2'],
-                            'correlation': correlation,
-                            'n_observations': len(x_vals)
-                        })
+                correlations.append({
+                    'trait1': record['trait1'],
+                    'trait2': record['trait2'],
+                    'correlation': record['correlation'],
+                    'n_observations': record['n']
+                })
         
         return sorted(correlations, key=lambda x: abs(x['correlation']), reverse=True)
 
+    def get_trait_dashboard(self, trait_name: str, max_nodes: int = 100, top_k: int = 20,
+                            environment: Optional[str] = None) -> Dict[str, Any]:
+        """Fetch the network, candidate and performance panels for a trait concurrently"""
+        network = self._executor.submit(self.get_gene_trait_network, trait_name, max_nodes)
+        candidates = self._executor.submit(self.get_candidate_genes, trait_name, top_k)
+        performance = self._executor.submit(self.get_germplasm_performance, trait_name, environment)
+        
+        nodes, edges = network.result()
+        return {
+            'nodes': nodes,
+            'edges': edges,
+            'candidates': candidates.result(),
+            'performance': performance.result()
+        }
+
 # Initialize KG API
 kg_api = KnowledgeGraphAPI(
     neo4j_uri=os.environ.get('NEO4J_URI', 'bolt://localhost:7687'),
@@ -272,6 +381,75 @@ kg_api = KnowledgeGraphAPI(
     password=os.environ.get('NEO4J_PASSWORD', 'password')
 )
 
+# Cache-aside store for read-only API responses
+response_cache = dashboard_cache.create_cache()
+
+def json_response(payload: Dict[str, Any]):
+    """Serialize a JSON payload with orjson when available, else Flask's jsonify"""
+    if ORJSON_AVAILABLE:
+        return app.response_class(
+            orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+            mimetype='application/json'
+        )
+    return jsonify(payload)
+
+def _dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes, preferring orjson"""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(obj).encode('utf-8')
+
+def stream_json_records(key: str, records: Iterable[Dict]):
+    """Stream records as {key: [...], "status": "success"} without building the list"""
+    def generate():
+        yield b'{' + _dumps(key) + b':['
+        for i, record in enumerate(records):
+            if i:
+                yield b','
+            yield _dumps(record)
+        yield b'],"status":"success"}'
+    return app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+def _tee_to_cache(key: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Pass streamed chunks through and cache the full body once the stream completes"""
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    response_cache.set(key, b''.join(body))
+
+def cached_response(view):
+    """Serve repeated API calls with identical parameters from the response cache"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = dashboard_cache.make_key(request.path, request.args.to_dict(flat=False))
+        body = response_cache.get(key)
+        if body is not None:
+            response = app.response_class(body, mimetype='application/json')
+            response.headers['X-Cache'] = 'HIT'
+            return response
+        
+        response = app.make_response(view(*args, **kwargs))
+        if response.status_code == 200:
+            if response.is_streamed:
+                response.response = _tee_to_cache(key, response.response)
+            else:
+                response_cache.set(key, response.get_data())
+        response.headers['X-Cache'] = 'MISS'
+        return response
+    return wrapper
+
+@app.before_request
+def open_neo4j_session():
+    """Share one read session across all KG calls made by a request"""
+    g.neo_session = kg_api.driver.session(default_access_mode="READ")
+
+@app.teardown_request
+def close_neo4j_session(exception=None):
+    neo_session = g.pop('neo_session', None)
+    if neo_session is not None:
+        neo_session.close()
+
 # Routes
 @app.route('/')
 def index():
@@ -279,17 +457,19 @@ def index():
     return render_template('dashboard.html')
 
 @app.route('/api/network')
+@cached_response
 def get_network():
     """API endpoint for gene-trait network data"""
     trait_filter = request.args.get('trait_filter', '')
     max_nodes = int(request.args.get('max_nodes', 100))
     
     try:
-        nodes, edges = kg_api.get_gene_trait_network(trait_filter, max_nodes)
+        nodes, edges = kg_api.get_gene_trait_network(trait_filter, max_nodes,
+                                                     session=g.neo_session)
         
-        return jsonify({
-            'nodes': [asdict(node) for node in nodes],
-            'edges': [asdict(edge) for edge in edges],
+        return json_response({
+            'nodes': [node.to_dict() for node in nodes],
+            'edges': [edge.to_dict() for edge in edges],
             'status': 'success'
         })
     
@@ -298,6 +478,7 @@ def get_network():
         return jsonify({'error': str(e), 'status': 'error'}), 500
 
 @app.route('/api/candidates')
+@cached_response
 def get_candidates():
     """API endpoint for candidate gene predictions"""
     trait_name = request.args.get('trait_name', '')
@@ -307,10 +488,10 @@ def get_candidates():
         return jsonify({'error': 'trait_name parameter required', 'status': 'error'}), 400
     
     try:
-        candidates = kg_api.get_candidate_genes(trait_name, top_k)
+        candidates = kg_api.get_candidate_genes(trait_name, top_k, session=g.neo_session)
         
-        return jsonify({
-            'candidates': [asdict(candidate) for candidate in candidates],
+        return json_response({
+            'candidates': [candidate.to_dict() for candidate in candidates],
             'status': 'success'
         })
     
@@ -319,6 +500,7 @@ def get_candidates():
         return jsonify({'error': str(e), 'status': 'error'}), 500
 
 @app.route('/api/performance')
+@cached_response
 def get_performance():
     """API endpoint for germplasm performance data"""
     trait_name = request.args.get('trait_name', '')
@@ -328,21 +510,23 @@ def get_performance():
         return jsonify({'error': 'trait_name parameter required', 'status': 'error'}), 400
     
     try:
-        performance_data = kg_api.get_germplasm_performance(
+        records = kg_api.iter_germplasm_performance(
             trait_name, 
-            environment if environment else None
+            environment if environment else None,
+            session=g.neo_session
         )
         
-        return jsonify({
-            'performance': performance_data,
-            'status': 'success'
-        })
+        # Pull the first row eagerly so query errors still produce a 500
+        first = next(records, None)
+        rows = records if first is None else itertools.chain([first], records)
+        return stream_json_records('performance', rows)
     
     except Exception as e:
         logger.error(f"Error getting performance data: {e}")
         return jsonify({'error': str(e), 'status': 'error'}), 500
 
 @app.route('/api/correlations')
+@cached_response
 def get_correlations():
     """API endpoint for trait correlations"""
     trait_name = request.args.get('trait_name', '')
@@ -351,7 +535,7 @@ def get_correlations():
         return jsonify({'error': 'trait_name parameter required', 'status': 'error'}), 400
     
     try:
-        correlations = kg_api.get_trait_correlations(trait_name)
+        correlations = kg_api.get_trait_correlations(trait_name, session=g.neo_session)
         
         return jsonify({
             'correlations': correlations,
@@ -362,6 +546,36 @@ def get_correlations():
         logger.error(f"Error getting correlations: {e}")
         return jsonify({'error': str(e), 'status': 'error'}), 500
 
+@app.route('/api/dashboard')
+@cached_response
+def get_dashboard():
+    """API endpoint returning the network, candidate and performance panels in one payload"""
+    trait_name = request.args.get('trait_name', '')
+    max_nodes = int(request.args.get('max_nodes', 100))
+    top_k = int(request.args.get('top_k', 20))
+    environment = request.args.get('environment', '')
+    
+    if not trait_name:
+        return jsonify({'error': 'trait_name parameter required', 'status': 'error'}), 400
+    
+    try:
+        panels = kg_api.get_trait_dashboard(
+            trait_name, max_nodes, top_k,
+            environment if environment else None
+        )
+        
+        return json_response({
+            'nodes': [node.to_dict() for node in panels['nodes']],
+            'edges': [edge.to_dict() for edge in panels['edges']],
+            'candidates': [candidate.to_dict() for candidate in panels['candidates']],
+            'performance': panels['performance'],
+            'status': 'success'
+        })
+    
+    except Exception as e:
+        logger.error(f"Error getting dashboard data: {e}")
+        return jsonify({'error': str(e), 'status': 'error'}), 500
+
 @app.route('/api/search')
 def search():
     """API endpoint for searching genes and traits"""
@@ -373,20 +587,9 @@ def search():
     
     try:
         # Simple search implementation
-        cypher_query = """
-        MATCH (n)
-        WHERE (n:Gene OR n:Trait) 
-        AND (n.name CONTAINS $query OR n.symbol CONTAINS $query)
-        RETURN n.name as name, 
-               n.symbol as symbol,
-               labels(n)[0] as type,
-               n.description as description
-        LIMIT 20
-        """
-        
         results = []
-        with kg_api.driver.session() as session:
-            result = session.run(cypher_query, query=query)
+        with kg_api._session(g.neo_session) as session:
+            result = session.run(_SEARCH_QUERY, query=query)
             
             for record in result:
                 results.append({
@@ -428,6 +631,41 @@ def not_found(error):
 def internal_error(error):
     return render_template('500.html'), 500
 
+def warmup_hot_traits():
+    """Prime the query plan and response caches for the most requested traits"""
+    # Trait names as stored in the graph, since they are part of the cache key
+    hot_traits = [t.strip() for t in
+                  os.environ.get('HOT_TRAITS', 'Yield,Drought Tolerance,Kernel Color').split(',')
+                  if t.strip()]
+    
+    # Only URLs templates/dashboard.html actually issues, so the cache keys match
+    urls = ['/api/network?max_nodes=50']
+    for trait in hot_traits:
+        urls.append('/api/candidates?' + urlencode({'trait_name': trait, 'top_k': 10}))
+        urls.append('/api/performance?' + urlencode({'trait_name': trait}))
+    
+    client = app.test_client()
+    for url in urls:
+        try:
+            # Drain the body: streamed responses only reach the cache (and close
+            # their request context and Neo4j session) once fully consumed
+            with client.get(url) as response:
+                response.get_data()
+        except Exception as e:
+            logger.warning(f"Warmup request {url} failed: {e}")
+    logger.info(f"Warmed dashboard caches for {len(hot_traits)} hot traits")
+
+def init_app():
+    """
+    Warm query plans and hot-trait caches in this process. Call once per serving
+    worker, e.g. from the gunicorn post_fork hook in gunicorn.conf.py; importing
+    the module does not warm anything.
+    """
+    kg_api.warm_query_plans()
+    # Warm in the background so worker startup is not blocked
+    threading.Thread(target=warmup_hot_traits, name='kg-warmup', daemon=True).start()
+    logger.info("Breeder Dashboard initialized for production")
+
 def find_available_port(start_port=5001):
     """Find an available port starting from start_port"""
     import socket
@@ -476,6 +714,3 @@ if __name__ == '__main__':
                 print("❌ Could not find any available port")
         else:
             raise
-else:
-    # Production WSGI
-    logger.info("Breeder Dashboard initialized for production")
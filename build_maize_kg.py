@@ -7,7 +7,10 @@ with proper node labels and relationships for genetic data.
 """
 
 import pandas as pd
+import numpy as np
 import os
+import re
+from collections import defaultdict
 try:
     from dotenv import load_dotenv
     DOTENV_AVAILABLE = True
@@ -15,9 +18,25 @@ except ImportError:
     DOTENV_AVAILABLE = False
     print("Note: python-dotenv not installed. Using default Neo4j settings.")
 from neo4j import GraphDatabase
+from dashboard_cache import invalidate_dashboard_cache
 import warnings
 warnings.filterwarnings("ignore")
 
+# Node labels managed by this script
+NODE_TYPES = ['Gene', 'Trait', 'Genotype', 'QTL', 'Chromosome', 'Trial', 'Location', 'Weather']
+
+# Entity name patterns used to infer node labels
+GENE_PATTERNS = ['DREB2A', 'ZmNAC111', 'PSY1']
+TRAIT_PATTERNS = ['tolerance', 'yield', 'depth', 'color', 'roots']
+GENOTYPE_NAMES = ['B73', 'Mo17', 'CML247']
+LOCATION_NAMES = ['Ames']
+WEATHER_NAMES = ['Drought']
+
+# Precompiled alternations for classify_entities: one vectorized scan per rule
+# instead of one per pattern
+GENE_RE = re.compile('|'.join(map(re.escape, GENE_PATTERNS)))
+TRAIT_RE = re.compile('|'.join(map(re.escape, TRAIT_PATTERNS)), re.IGNORECASE)
+
 class Neo4jConnection:
     """Neo4j database connection wrapper"""
 
@@ -38,6 +57,15 @@ class Neo4jConnection:
             result = session.run(cypher, params or {})
             return [record.data() for record in result]
 
+    def write_many(self, statements):
+        """Execute several (cypher, params) statements in one write transaction"""
+        def _run_all(tx):
+            return [[record.data() for record in tx.run(cypher, params or {})]
+                    for cypher, params in statements]
+
+        with self.driver.session(database=self.database) as session:
+            return session.execute_write(_run_all)
+
 def setup_neo4j_connection():
     """Setup Neo4j connection using environment variables"""
     if DOTENV_AVAILABLE:
@@ -69,137 +97,131 @@ def setup_neo4j_connection():
 
     return kg
 
-def clear_existing_data(kg):
+def clear_existing_data(kg, batch_size=10000):
     """Clear existing maize data from the graph"""
     print("Clearing existing maize data...")
 
-    # Delete all nodes and relationships (be careful with this in production!)
-    cypher = """
-    MATCH (n)
-    WHERE n:Gene OR n:Trait OR n:Genotype OR n:QTL OR n:Chromosome OR
-          n:Trial OR n:Location OR n:Weather
-    DETACH DELETE n
-    """
-    kg.query(cypher)
+    # Delete nodes and relationships (be careful with this in production!)
+    # One label at a time so the label scan is used, committed in batches
+    for node_type in NODE_TYPES:
+        if not kg.query(f"MATCH (n:{node_type}) RETURN 1 AS found LIMIT 1"):
+            continue
+
+        try:
+            # Neo4j 4.4+
+            kg.query(f"""
+            CALL {{ MATCH (n:{node_type}) DETACH DELETE n }}
+            IN TRANSACTIONS OF {batch_size} ROWS
+            """)
+        except Exception:
+            try:
+                kg.query(
+                    "CALL apoc.periodic.iterate($match, 'DETACH DELETE n', {batchSize: $batch_size})",
+                    params={'match': f"MATCH (n:{node_type}) RETURN n", 'batch_size': batch_size}
+                )
+            except Exception:
+                kg.query(f"MATCH (n:{node_type}) DETACH DELETE n")
     print("Existing data cleared.")
 
-def determine_node_type(entity_name):
-    """Determine the appropriate node label based on entity name patterns"""
-    entity_lower = entity_name.lower()
-    
-    # Gene patterns
-    if any(gene in entity_name for gene in ['DREB2A', 'ZmNAC111', 'PSY1']):
-        return 'Gene'
-    
-    # Trait patterns
-    elif any(trait in entity_lower for trait in ['tolerance', 'yield', 'depth', 'color', 'roots']):
-        return 'Trait'
-    
-    # Genotype patterns (typically alphanumeric codes)
-    elif entity_name in ['B73', 'Mo17', 'CML247']:
-        return 'Genotype'
-    
-    # QTL patterns
-    elif entity_name.startswith('q') and any(char.isdigit() for char in entity_name):
-        return 'QTL'
-    
-    # Chromosome patterns
-    elif 'chromosome' in entity_lower:
-        return 'Chromosome'
-    
-    # Trial patterns
-    elif 'trial' in entity_lower:
-        return 'Trial'
-    
-    # Location patterns
-    elif entity_name in ['Ames']:
-        return 'Location'
+def classify_entities(entities):
+    """Infer the node label of each entity from its name; returns {entity: label}"""
+    ents = pd.Series(list(entities), dtype=object)
+    ents_lower = ents.str.lower()
+
+    # Conditions follow NODE_TYPES; the first matching rule wins
+    conditions = [
+        ents.str.contains(GENE_RE, na=False),
+        ents.str.contains(TRAIT_RE, na=False),
+        ents.isin(GENOTYPE_NAMES),
+        ents.str.startswith('q', na=False) & ents.str.contains(r'\d', na=False),
+        ents_lower.str.contains('chromosome', regex=False, na=False),
+        ents_lower.str.contains('trial', regex=False, na=False),
+        ents.isin(LOCATION_NAMES),
+        ents.isin(WEATHER_NAMES),
+    ]
+    node_types = np.select(conditions, NODE_TYPES, default='Entity')
+    return dict(zip(ents, node_types.tolist()))
+
+def node_batch_statements(nodes_by_label):
+    """Build one UNWIND MERGE statement per node label"""
+    statements = []
+    for node_type, rows in nodes_by_label.items():
+        cypher = f"""
+        UNWIND $rows AS r
+        MERGE (n:{node_type} {{name: r.name}})
+        """
+        statements.append((cypher, {'rows': rows}))
+    return statements
+
+def relationship_batch_statements(rels_by_group):
+    """Build one UNWIND MERGE statement per (subject_type, object_type, type) group"""
+    statements = []
+    for (subject_type, object_type, relationship_type), rows in rels_by_group.items():
+        cypher = f"""
+        UNWIND $rows AS r
+        MATCH (s:{subject_type} {{name: r.s}})
+        MATCH (o:{object_type} {{name: r.o}})
+        MERGE (s)-[rel:{relationship_type}]->(o)
+        RETURN count(rel) AS created
+        """
+        statements.append((cypher, {'rows': rows}))
+    return statements
+
+def load_chunk(kg, df):
+    """Create the nodes and relationships of one CSV chunk in a single write transaction"""
+    entities = pd.unique(df[['subject', 'object']].to_numpy().ravel())
     
-    # Weather patterns
-    elif entity_name in ['Drought']:
-        return 'Weather'
+    # Determine node types for all entities and group them by label
+    entity_types = classify_entities(entities)
+    nodes_by_label = defaultdict(list)
+    for entity, node_type in entity_types.items():
+        nodes_by_label[node_type].append({'name': entity})
     
-    # Default to Entity if no pattern matches
-    else:
-        return 'Entity'
-
-def create_node(kg, entity_name, node_type):
-    """Create a node with appropriate label and properties"""
-    cypher = f"""
-    MERGE (n:{node_type} {{name: $name}})
-    RETURN n
-    """
-    kg.query(cypher, params={'name': entity_name})
-
-def create_relationship(kg, subject, predicate, object_entity, subject_type, object_type):
-    """Create a relationship between two nodes"""
-    # Convert predicate to uppercase and replace spaces with underscores
-    relationship_type = predicate.upper().replace(' ', '_')
+    rels_by_group = defaultdict(list)
+    triples = df[['subject', 'predicate', 'object']].itertuples(index=False, name=None)
+    for subject, predicate, object_entity in triples:
+        # Convert predicate to uppercase and replace spaces with underscores
+        relationship_type = predicate.upper().replace(' ', '_')
+        key = (entity_types[subject], entity_types[object_entity], relationship_type)
+        rels_by_group[key].append({'s': subject, 'o': object_entity})
     
-    cypher = f"""
-    MATCH (s:{subject_type} {{name: $subject}})
-    MATCH (o:{object_type} {{name: $object}})
-    MERGE (s)-[r:{relationship_type}]->(o)
-    RETURN s, r, o
-    """
+    # Nodes first so the relationship MATCHes see them within the same transaction
+    node_statements = node_batch_statements(nodes_by_label)
+    rel_statements = relationship_batch_statements(rels_by_group)
+    results = kg.write_many(node_statements + rel_statements)
     
-    result = kg.query(cypher, params={
-        'subject': subject, 
-        'object': object_entity
-    })
+    rel_results = results[len(node_statements):]
+    for ((subject_type, object_type, relationship_type), rows), result in zip(rels_by_group.items(), rel_results):
+        created = result[0]['created'] if result else 0
+        if created < len(rows):
+            print(f"Warning: Could only create {created}/{len(rows)} "
+                  f"{subject_type} -{relationship_type}-> {object_type} relationships")
     
-    if not result:
-        print(f"Warning: Could not create relationship {subject} -{relationship_type}-> {object_entity}")
+    return entities
 
-def load_and_process_data(kg, csv_file='toydata/maize.csv'):
+def load_and_process_data(kg, csv_file='toydata/maize.csv', chunksize=5000):
     """Load CSV data and create knowledge graph"""
     print(f"Loading data from {csv_file}...")
     
-    # Read the CSV file
-    df = pd.read_csv(csv_file)
-    print(f"Loaded {len(df)} relationships from CSV")
-    
-    # First pass: create all nodes
-    print("Creating nodes...")
-    entities = set()
-    entity_types = {}
-    
-    for _, row in df.iterrows():
-        subject = row['subject']
-        object_entity = row['object']
-        
-        entities.add(subject)
-        entities.add(object_entity)
-    
-    # Determine node types for all entities
-    for entity in entities:
-        node_type = determine_node_type(entity)
-        entity_types[entity] = node_type
-        create_node(kg, entity, node_type)
+    # Stream the CSV so memory and transaction size stay bounded by chunksize
+    all_entities = set()
+    total_rows = 0
+    for chunk in pd.read_csv(csv_file, chunksize=chunksize):
+        all_entities.update(load_chunk(kg, chunk))
+        total_rows += len(chunk)
+        print(f"Processed {total_rows} relationships...")
     
-    print(f"Created {len(entities)} nodes")
-    
-    # Second pass: create relationships
-    print("Creating relationships...")
-    for _, row in df.iterrows():
-        subject = row['subject']
-        predicate = row['predicate']
-        object_entity = row['object']
-        
-        subject_type = entity_types[subject]
-        object_type = entity_types[object_entity]
-        
-        create_relationship(kg, subject, predicate, object_entity, subject_type, object_type)
-    
-    print(f"Created {len(df)} relationships")
+    print(f"Created {len(all_entities)} nodes")
+    print(f"Created {total_rows} relationships")
+
+    # Cached dashboard responses are stale once the graph is rewritten
+    invalidate_dashboard_cache()
 
 def add_constraints_and_indexes(kg):
     """Add constraints and indexes for better performance"""
     print("Adding constraints and indexes...")
     
-    node_types = ['Gene', 'Trait', 'Genotype', 'QTL', 'Chromosome', 'Trial', 'Location', 'Weather']
-    
-    for node_type in node_types:
+    for node_type in NODE_TYPES:
         try:
             # Create uniqueness constraint on name property
             cypher = f"CREATE CONSTRAINT {node_type.lower()}_name_unique IF NOT EXISTS FOR (n:{node_type}) REQUIRE n.name IS UNIQUE"
@@ -211,6 +233,14 @@ def add_constraints_and_indexes(kg):
         except Exception as e:
             print(f"Note: Constraint/index for {node_type} may already exist: {e}")
 
+    # Text indexes serve the CONTAINS lookups used by dashboard search
+    for node_type in ['Gene', 'Trait']:
+        try:
+            cypher = f"CREATE TEXT INDEX {node_type.lower()}_name_text IF NOT EXISTS FOR (n:{node_type}) ON (n.name)"
+            kg.query(cypher)
+        except Exception as e:
+            print(f"Note: Text index for {node_type} could not be created: {e}")
+
 def verify_graph(kg):
     """Verify the created graph by running some queries"""
     print("\n=== Graph Verification ===")
@@ -220,8 +250,7 @@ def verify_graph(kg):
     print(f"Total nodes: {result[0]['total_nodes']}")
     
     # Count nodes by type
-    node_types = ['Gene', 'Trait', 'Genotype', 'QTL', 'Chromosome', 'Trial', 'Location', 'Weather']
-    for node_type in node_types:
+    for node_type in NODE_TYPES:
         result = kg.query(f"MATCH (n:{node_type}) RETURN count(n) as count")
         count = result[0]['count'] if result else 0
         if count > 0:
@@ -264,12 +293,12 @@ def main():
         # Clear existing data (optional - comment out if you want to keep existing data)
         clear_existing_data(kg)
 
+        # Add constraints and indexes first so relationship MATCHes use them
+        add_constraints_and_indexes(kg)
+
         # Load and process the CSV data
         load_and_process_data(kg)
 
-        # Add constraints and indexes
-        add_constraints_and_indexes(kg)
-
         # Verify the graph
         verify_graph(kg)
 
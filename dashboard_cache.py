@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Response Cache for the Breeder Dashboard
+
+Cache-aside store for serialized dashboard API responses. Uses Redis when
+REDIS_URL is set and the redis client is installed, otherwise falls back to
+an in-process TTL cache (suitable for development and single-worker setups).
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL', 120))
+KEY_PREFIX = 'kg_dashboard'
+
+
+def make_key(endpoint: str, params: Dict[str, Any]) -> str:
+    """Build a stable cache key from an endpoint name and its parameters"""
+    payload = json.dumps([endpoint, params], sort_keys=True, default=str)
+    return f"{KEY_PREFIX}:{hashlib.sha256(payload.encode('utf-8')).hexdigest()}"
+
+
+class InMemoryCache:
+    """Thread-safe in-process TTL cache"""
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: int = DEFAULT_TTL):
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Evict the oldest insertion to stay bounded
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (time.monotonic() + ttl, value)
+
+    def invalidate(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class RedisCache:
+    """Redis-backed TTL cache shared across worker processes"""
+
+    def __init__(self, url: str):
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self.client.get(key)
+        except redis.RedisError as e:
+            logger.warning(f"Cache read failed: {e}")
+            return None
+
+    def set(self, key: str, value: bytes, ttl: int = DEFAULT_TTL):
+        try:
+            self.client.set(key, value, ex=ttl)
+        except redis.RedisError as e:
+            logger.warning(f"Cache write failed: {e}")
+
+    def invalidate(self):
+        try:
+            keys = list(self.client.scan_iter(match=f"{KEY_PREFIX}:*"))
+            if keys:
+                self.client.delete(*keys)
+        except redis.RedisError as e:
+            logger.warning(f"Cache invalidation failed: {e}")
+
+
+def create_cache():
+    """Create the configured cache backend"""
+    redis_url = os.environ.get('REDIS_URL')
+    if redis_url and REDIS_AVAILABLE:
+        logger.info("Using Redis dashboard cache")
+        return RedisCache(redis_url)
+    if redis_url:
+        logger.warning("REDIS_URL is set but redis is not installed; using in-process cache")
+    return InMemoryCache()
+
+
+def invalidate_dashboard_cache():
+    """Drop cached dashboard responses after the graph has been rewritten"""
+    create_cache().invalidate()
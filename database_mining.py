@@ -6,24 +6,292 @@ This script demonstrates how to extract data from biological databases
 like MaizeGDB, Gramene, KEGG, and others for knowledge graph construction.
 """
 
+import argparse
 import requests
 import json
 import csv
+import io
+import os
+import platform
+import re
 import time
-import xml.etree.ElementTree as ET
-from typing import List, Dict, Any, Optional
-import pandas as pd
+import threading
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:
+    # The stdlib module already uses the C accelerator when present
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from urllib.parse import urlparse
+
+try:
+    # Optional on PyPy, where the pure-Python parsing path is already fast
+    import numpy as np
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+try:
+    import httpx
+    import h2  # noqa: F401 - required for httpx HTTP/2 support
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+try:
+    import requests_cache
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
+
+USER_AGENT = 'Mozilla/5.0 (compatible; KnowledgeGraphMiner/1.0)'
+
+# KEGG pathway name keywords and the category each maps to, in priority order
+PATHWAY_CATEGORIES = {
+    'metabolism': 'Metabolic Pathway',
+    'signaling': 'Signaling Pathway',
+    'biosynthesis': 'Biosynthesis Pathway',
+}
+
+# This simulates what you might extract from MaizeGDB; built once at import
+# and shared read-only between queries
+MAIZEGDB_SIMULATED_GENES = MappingProxyType({
+    "DREB2A": (
+        {"subject": "DREB2A", "predicate": "located_on", "object": "Chromosome 1"},
+        {"subject": "DREB2A", "predicate": "regulates", "object": "Drought Tolerance"},
+        {"subject": "DREB2A", "predicate": "has_function", "object": "Transcription Factor Activity"}
+    ),
+    "ZmVPP1": (
+        {"subject": "ZmVPP1", "predicate": "located_on", "object": "Chromosome 1"},
+        {"subject": "ZmVPP1", "predicate": "regulates", "object": "ABA Response"},
+        {"subject": "ZmVPP1", "predicate": "has_function", "object": "Protein Phosphatase Activity"}
+    )
+})
+
+# Requests per second each API documents as acceptable; other hosts get 1/s
+HOST_RATE_LIMITS = {
+    'data.gramene.org': 5.0,
+    'rest.kegg.jp': 3.0,
+    'rest.uniprot.org': 10.0,
+    'rest.ensembl.org': 15.0,
+}
+
+# Ensembl lookup fields emitted as relationships: (field, predicate, object formatter)
+ENSEMBL_SCHEMA = (
+    ('seq_region_name', 'located_on', lambda value: f"Chromosome {value}"),
+    ('biotype', 'has_biotype', str),
+)
+
+# GO terms worth keeping as has_go_term relationships
+GO_TERM_KEEP = re.compile(r'binding|activity|process', re.IGNORECASE).search
+
+# Seconds an idle pooled connection is kept open (httpx defaults to 5)
+KEEPALIVE_EXPIRY = 60.0
+
+RELATIONSHIP_COLUMNS = ['subject', 'predicate', 'object']
+
+# Callback that receives each mined relationship as soon as it is parsed
+Sink = Callable[[Dict[str, str]], None]
+
+# Status codes worth retrying with backoff
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+def classify_pathway_name(name: str) -> str:
+    """Map one pathway name to its category; the first matching keyword wins"""
+    lowered = name.lower()
+    for keyword, category in PATHWAY_CATEGORIES.items():
+        if keyword in lowered:
+            return category
+    return "Biological Pathway"
+
+def classify_pathway_names(names: 'pd.Series') -> 'np.ndarray':
+    """Map pathway names to categories in bulk; the first matching keyword wins"""
+    lowered = names.str.lower()
+    conditions = [lowered.str.contains(keyword, regex=False).to_numpy(dtype=bool)
+                  for keyword in PATHWAY_CATEGORIES]
+    return np.select(conditions, list(PATHWAY_CATEGORIES.values()), default="Biological Pathway")
+
+@lru_cache(maxsize=10_000)
+def fetch_maizegdb_gene(gene: str) -> Tuple[Dict[str, str], ...]:
+    """
+    Simulate MaizeGDB query - replace with actual API calls.
+    Cached per process, since several mining routines converge on the same genes.
+    """
+    return MAIZEGDB_SIMULATED_GENES.get(gene, ())
+
+def load_json(response: requests.Response) -> Any:
+    """Decode a JSON response body, using orjson when it is installed"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+class TokenBucket:
+    """Thread-safe per-host token bucket that also honors server rate-limit headers"""
+    
+    def __init__(self, rate: float = 1.0, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.last = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+    
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+    
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.paused_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(self.paused_until - now, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+    
+    def pause(self, seconds: float):
+        """Stop handing out tokens for the given number of seconds"""
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            self.tokens = 0
+    
+    def update(self, headers):
+        """Drain the bucket until the reset time when the server reports no quota left"""
+        remaining = headers.get('X-RateLimit-Remaining', '')
+        reset = headers.get('X-RateLimit-Reset', '')
+        if remaining.isdigit() and int(remaining) == 0 and reset.replace('.', '', 1).isdigit():
+            reset_seconds = float(reset)
+            # Some APIs send an epoch timestamp rather than a delay
+            if reset_seconds > 1e9:
+                reset_seconds -= time.time()
+            self.pause(max(reset_seconds, 0))
 
 class DatabaseMiner:
     """Class to handle mining from various biological databases"""
     
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (compatible; KnowledgeGraphMiner/1.0)'
-        })
+    def __init__(self, max_workers: int = 8, max_retries: int = 3,
+                 cache_name: Optional[str] = 'db_mining_cache', cache_expire_after: int = 86400,
+                 http2: bool = True):
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        # Remote records rarely change, so responses are cached on disk between runs
+        self.cache_name = cache_name if REQUESTS_CACHE_AVAILABLE else None
+        self.cache_expire_after = cache_expire_after
+        # Without an on-disk cache, multiplex concurrent lookups over one HTTP/2 connection
+        self.http2 = http2 and HTTP2_AVAILABLE and not self.cache_name
+        self.session = self._new_session()
+        self._local = threading.local()
+        self._limiters: Dict[str, TokenBucket] = {}
+        self._limiters_lock = threading.Lock()
+    
+    def _new_session(self) -> requests.Session:
+        if self.http2:
+            # Keep idle connections long enough to survive rate-limit pauses,
+            # so lookups resume without a fresh TCP + TLS handshake
+            limits = httpx.Limits(max_connections=self.max_workers,
+                                  max_keepalive_connections=self.max_workers,
+                                  keepalive_expiry=KEEPALIVE_EXPIRY)
+            return httpx.Client(http2=True, headers={'User-Agent': USER_AGENT},
+                                timeout=10, limits=limits)
+        if self.cache_name:
+            session = requests_cache.CachedSession(
+                self.cache_name,
+                backend='sqlite',
+                expire_after=self.cache_expire_after,
+                allowable_methods=('GET', 'POST'),
+                cache_control=True
+            )
+        else:
+            session = requests.Session()
+        session.headers.update({'User-Agent': USER_AGENT})
+        return session
+    
+    def _thread_session(self) -> requests.Session:
+        """requests.Session is not thread-safe, so each worker thread gets its own"""
+        if self.http2 or threading.current_thread() is threading.main_thread():
+            # httpx.Client is thread-safe and shares its HTTP/2 connections
+            return self.session
+        if not hasattr(self._local, 'session'):
+            self._local.session = self._new_session()
+        return self._local.session
+    
+    def _limiter(self, url: str) -> TokenBucket:
+        host = urlparse(url).netloc
+        with self._limiters_lock:
+            if host not in self._limiters:
+                self._limiters[host] = TokenBucket(HOST_RATE_LIMITS.get(host, 1.0))
+            return self._limiters[host]
     
-    def mine_maizegdb_genes(self) -> List[Dict[str, str]]:
+    def _request(self, method: str, url: str, refresh: bool = False, **kwargs) -> requests.Response:
+        """Rate-limited HTTP request with exponential backoff on 429/5xx"""
+        kwargs.setdefault('timeout', 10)
+        session = self._thread_session()
+        
+        if self.cache_name:
+            if refresh:
+                kwargs['force_refresh'] = True
+            else:
+                # Cache hits never touch the network, so they skip the rate limiter
+                cached = session.request(method, url, only_if_cached=True, **kwargs)
+                # (a cache miss comes back as a synthetic 504)
+                if getattr(cached, 'from_cache', False) and cached.status_code != 504:
+                    return cached
+        
+        limiter = self._limiter(url)
+        for attempt in range(self.max_retries + 1):
+            limiter.acquire()
+            response = session.request(method, url, **kwargs)
+            limiter.update(response.headers)
+            if response.status_code not in RETRY_STATUS_CODES or attempt == self.max_retries:
+                return response
+            retry_after = response.headers.get('Retry-After', '')
+            delay = float(retry_after) if retry_after.isdigit() else 2 ** attempt
+            if response.status_code == 429:
+                # Hold back every worker talking to this host, not just this one
+                limiter.pause(delay)
+            else:
+                time.sleep(delay)
+        return response
+    
+    def _map_concurrent(self, func: Callable[[Any], List[Dict[str, str]]],
+                        items: List[Any], sink: Optional[Sink] = None) -> List[Dict[str, str]]:
+        """
+        Run func over items on a thread pool and flatten the results in input order.
+        With a sink, each relationship is handed over as it arrives instead of collected.
+        """
+        relationships = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            for result in executor.map(func, items):
+                if sink is None:
+                    relationships.extend(result)
+                else:
+                    for rel in result:
+                        sink(rel)
+        return relationships
+    
+    def mine_maizegdb_genes(self, sink: Optional[Sink] = None) -> List[Dict[str, str]]:
         """
         Mine gene data from MaizeGDB
         Note: This is a demonstration - actual API endpoints may differ
@@ -32,7 +300,6 @@ class DatabaseMiner:
         
         # MaizeGDB doesn't have a public REST API, but we can demonstrate
         # the approach using their search functionality
-        relationships = []
         
         # Example genes to search for (in practice, you'd get these from their database)
         example_genes = [
@@ -40,49 +307,29 @@ class DatabaseMiner:
             "ZmEREB180", "ZmWRKY33", "ZmMYB31", "ZmHDZ10", "ZmTCP14"
         ]
         
-        for gene in example_genes:
+        def query_gene(gene):
             try:
                 # Simulate database query (replace with actual API calls)
-                gene_info = self._simulate_maizegdb_query(gene)
-                if gene_info:
-                    relationships.extend(gene_info)
-                time.sleep(1)  # Rate limiting
+                return fetch_maizegdb_gene(gene)
             except Exception as e:
                 print(f"Error querying {gene}: {e}")
+                return []
         
-        return relationships
+        return self._map_concurrent(query_gene, example_genes, sink)
     
-    def _simulate_maizegdb_query(self, gene: str) -> List[Dict[str, str]]:
-        """Simulate MaizeGDB query - replace with actual API calls"""
-        # This simulates what you might extract from MaizeGDB
-        gene_data = {
-            "DREB2A": [
-                {"subject": "DREB2A", "predicate": "located_on", "object": "Chromosome 1"},
-                {"subject": "DREB2A", "predicate": "regulates", "object": "Drought Tolerance"},
-                {"subject": "DREB2A", "predicate": "has_function", "object": "Transcription Factor Activity"}
-            ],
-            "ZmVPP1": [
-                {"subject": "ZmVPP1", "predicate": "located_on", "object": "Chromosome 1"},
-                {"subject": "ZmVPP1", "predicate": "regulates", "object": "ABA Response"},
-                {"subject": "ZmVPP1", "predicate": "has_function", "object": "Protein Phosphatase Activity"}
-            ]
-        }
-        return gene_data.get(gene, [])
-    
-    def mine_gramene_qtls(self) -> List[Dict[str, str]]:
+    def mine_gramene_qtls(self, refresh: bool = False, sink: Optional[Sink] = None) -> List[Dict[str, str]]:
         """
         Mine QTL data from Gramene database
         Gramene has REST APIs for plant comparative genomics
         """
         print("Mining Gramene for QTL information...")
         
-        relationships = []
         base_url = "https://data.gramene.org/v60/search"
         
         # Example QTL search (this is a simplified example)
         qtl_traits = ["drought tolerance", "yield", "flowering time", "plant height"]
         
-        for trait in qtl_traits:
+        def query_trait(trait):
             try:
                 # Construct search query
                 params = {
@@ -91,18 +338,16 @@ class DatabaseMiner:
                     'fl': 'id,name,description,species'
                 }
                 
-                response = self.session.get(base_url, params=params, timeout=10)
+                response = self._request('GET', base_url, refresh=refresh, params=params)
                 if response.status_code == 200:
-                    data = response.json()
-                    qtl_data = self._parse_gramene_response(data, trait)
-                    relationships.extend(qtl_data)
-                
-                time.sleep(1)  # Rate limiting
+                    data = load_json(response)
+                    return self._parse_gramene_response(data, trait)
                 
             except Exception as e:
                 print(f"Error querying Gramene for {trait}: {e}")
+            return []
         
-        return relationships
+        return self._map_concurrent(query_trait, qtl_traits, sink)
     
     def _parse_gramene_response(self, data: dict, trait: str) -> List[Dict[str, str]]:
         """Parse Gramene API response"""
@@ -121,7 +366,7 @@ class DatabaseMiner:
         
         return relationships
     
-    def mine_kegg_pathways(self) -> List[Dict[str, str]]:
+    def mine_kegg_pathways(self, refresh: bool = False, sink: Optional[Sink] = None) -> List[Dict[str, str]]:
         """
         Mine pathway data from KEGG database
         KEGG has REST APIs for pathway information
@@ -139,11 +384,15 @@ class DatabaseMiner:
         try:
             # Get list of pathways for maize
             pathway_url = f"{kegg_base}/list/pathway/{org_code}"
-            response = self.session.get(pathway_url, timeout=10)
+            response = self._request('GET', pathway_url, refresh=refresh)
             
             if response.status_code == 200:
                 pathways = self._parse_kegg_pathways(response.text)
-                relationships.extend(pathways)
+                if sink is None:
+                    relationships.extend(pathways)
+                else:
+                    for rel in pathways:
+                        sink(rel)
             
         except Exception as e:
             print(f"Error querying KEGG: {e}")
@@ -152,64 +401,86 @@ class DatabaseMiner:
     
     def _parse_kegg_pathways(self, pathway_data: str) -> List[Dict[str, str]]:
         """Parse KEGG pathway data"""
-        relationships = []
+        if not pathway_data.strip():
+            return []
         
-        for line in pathway_data.strip().split('\n'):
-            if line:
-                parts = line.split('\t')
-                if len(parts) >= 2:
-                    pathway_id = parts[0]
-                    pathway_name = parts[1]
-                    
-                    # Extract pathway category
-                    if "metabolism" in pathway_name.lower():
-                        category = "Metabolic Pathway"
-                    elif "signaling" in pathway_name.lower():
-                        category = "Signaling Pathway"
-                    elif "biosynthesis" in pathway_name.lower():
-                        category = "Biosynthesis Pathway"
-                    else:
-                        category = "Biological Pathway"
-                    
-                    relationships.append({
-                        "subject": pathway_name,
-                        "predicate": "is_a",
-                        "object": category
-                    })
+        if not PANDAS_AVAILABLE:
+            rows = csv.reader(io.StringIO(pathway_data.strip()), delimiter='\t',
+                              quoting=csv.QUOTE_NONE)
+            names = [row[1] for row in rows if len(row) >= 2][:10]  # Limit results
+            return [{"subject": name, "predicate": "is_a", "object": classify_pathway_name(name)}
+                    for name in names]
+        
+        df = pd.read_csv(io.StringIO(pathway_data), sep='\t', header=None,
+                         names=['id', 'name'], usecols=[0, 1], dtype=str,
+                         quoting=csv.QUOTE_NONE, engine='c').dropna(subset=['name'])
+        df = df.head(10)  # Limit results before doing any per-row work
         
-        return relationships[:10]  # Limit results
+        relationships = pd.DataFrame({
+            "subject": df['name'],
+            "predicate": "is_a",
+            "object": classify_pathway_names(df['name'])
+        })
+        
+        return relationships.to_dict('records')
     
-    def mine_uniprot_proteins(self, gene_list: List[str]) -> List[Dict[str, str]]:
+    def mine_uniprot_proteins(self, gene_list: List[str], batch_size: int = 50,
+                              refresh: bool = False, sink: Optional[Sink] = None) -> List[Dict[str, str]]:
         """
         Mine protein function data from UniProt
         UniProt has excellent REST APIs
         """
         print("Mining UniProt for protein function information...")
         
-        relationships = []
         base_url = "https://rest.uniprot.org/uniprotkb/search"
+        results_per_gene = 5
         
-        for gene in gene_list:
+        def query_batch(genes):
             try:
-                # Search for maize proteins
+                # One OR-joined search per batch of maize genes
+                gene_clause = ' OR '.join(f'gene:{gene}' for gene in genes)
                 params = {
-                    'query': f'organism_id:4577 AND gene:{gene}',  # 4577 = Zea mays
+                    'query': f'organism_id:4577 AND ({gene_clause})',  # 4577 = Zea mays
                     'format': 'json',
-                    'size': 5
+                    'size': min(results_per_gene * len(genes), 500)
                 }
                 
-                response = self.session.get(base_url, params=params, timeout=10)
+                response = self._request('GET', base_url, refresh=refresh, params=params)
                 if response.status_code == 200:
-                    data = response.json()
-                    protein_data = self._parse_uniprot_response(data, gene)
-                    relationships.extend(protein_data)
-                
-                time.sleep(1)  # Rate limiting
+                    data = load_json(response)
+                    
+                    # Map each result back to the requested gene(s) it names
+                    by_gene = {gene: [] for gene in genes}
+                    lookup = {gene.lower(): gene for gene in genes}
+                    for result in data.get('results', []):
+                        for name in self._uniprot_gene_names(result):
+                            gene = lookup.get(name.lower())
+                            if gene and len(by_gene[gene]) < results_per_gene:
+                                by_gene[gene].append(result)
+                    
+                    relationships = []
+                    for gene in genes:
+                        relationships.extend(self._parse_uniprot_response({'results': by_gene[gene]}, gene))
+                    return relationships
                 
             except Exception as e:
-                print(f"Error querying UniProt for {gene}: {e}")
+                print(f"Error querying UniProt for {', '.join(genes)}: {e}")
+            return []
         
-        return relationships
+        batches = [gene_list[i:i + batch_size] for i in range(0, len(gene_list), batch_size)]
+        return self._map_concurrent(query_batch, batches, sink)
+    
+    @staticmethod
+    def _uniprot_gene_names(result: dict) -> set:
+        """All gene names and synonyms a UniProt entry is recorded under"""
+        names = set()
+        for gene in result.get('genes', []):
+            if 'geneName' in gene:
+                names.add(gene['geneName'].get('value', ''))
+            for key in ('synonyms', 'orderedLocusNames', 'orfNames'):
+                names.update(item.get('value', '') for item in gene.get(key, []))
+        names.discard('')
+        return names
     
     def _parse_uniprot_response(self, data: dict, gene: str) -> List[Dict[str, str]]:
         """Parse UniProt API response"""
@@ -218,98 +489,170 @@ class DatabaseMiner:
         if 'results' in data:
             for result in data['results']:
                 # Extract protein function
-                if 'comments' in result:
-                    for comment in result['comments']:
-                        if comment.get('commentType') == 'FUNCTION':
-                            function_text = comment.get('texts', [{}])[0].get('value', '')
-                            if function_text:
-                                relationships.append({
-                                    "subject": gene,
-                                    "predicate": "has_function",
-                                    "object": function_text[:100] + "..." if len(function_text) > 100 else function_text
-                                })
+                function_texts = (comment.get('texts', [{}])[0].get('value', '')
+                                  for comment in result.get('comments', ())
+                                  if comment.get('commentType') == 'FUNCTION')
+                relationships.extend(
+                    {"subject": gene, "predicate": "has_function",
+                     "object": text[:100] + "..." if len(text) > 100 else text}
+                    for text in function_texts if text
+                )
                 
                 # Extract GO terms
-                if 'dbReferences' in result:
-                    for ref in result['dbReferences']:
-                        if ref.get('type') == 'GO':
-                            go_term = ref.get('properties', {}).get('term', '')
-                            if go_term and any(keyword in go_term.lower() for keyword in ['binding', 'activity', 'process']):
-                                relationships.append({
-                                    "subject": gene,
-                                    "predicate": "has_go_term",
-                                    "object": go_term
-                                })
+                go_terms = (ref.get('properties', {}).get('term', '')
+                            for ref in result.get('dbReferences', ())
+                            if ref.get('type') == 'GO')
+                relationships.extend(
+                    {"subject": gene, "predicate": "has_go_term", "object": go_term}
+                    for go_term in go_terms if go_term and GO_TERM_KEEP(go_term)
+                )
         
         return relationships
     
-    def mine_ensembl_plants(self, gene_list: List[str]) -> List[Dict[str, str]]:
+    def mine_ensembl_plants(self, gene_list: List[str], batch_size: int = 1000,
+                            refresh: bool = False, sink: Optional[Sink] = None) -> List[Dict[str, str]]:
         """
         Mine genomic data from Ensembl Plants
         Ensembl has comprehensive REST APIs
         """
         print("Mining Ensembl Plants for genomic information...")
         
-        relationships = []
-        base_url = "https://rest.ensembl.org"
+        # The POST lookup endpoint resolves up to 1000 symbols per request
+        lookup_url = "https://rest.ensembl.org/lookup/symbol/zea_mays"
+        headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
         
-        for gene in gene_list[:5]:  # Limit to avoid rate limits
+        def query_batch(genes):
             try:
-                # Search for gene information
-                search_url = f"{base_url}/lookup/symbol/zea_mays/{gene}"
-                headers = {'Content-Type': 'application/json'}
-                
-                response = self.session.get(search_url, headers=headers, timeout=10)
+                response = self._request('POST', lookup_url, refresh=refresh, headers=headers,
+                                         json={'symbols': genes})
                 if response.status_code == 200:
-                    data = response.json()
-                    genomic_data = self._parse_ensembl_response(data, gene)
-                    relationships.extend(genomic_data)
-                
-                time.sleep(1)  # Rate limiting
+                    data = load_json(response)
+                    relationships = []
+                    for gene, gene_data in data.items():
+                        if gene_data:
+                            relationships.extend(self._parse_ensembl_response(gene_data, gene))
+                    return relationships
                 
             except Exception as e:
-                print(f"Error querying Ensembl for {gene}: {e}")
+                print(f"Error querying Ensembl for {', '.join(genes)}: {e}")
+            return []
         
-        return relationships
+        batches = [gene_list[i:i + batch_size] for i in range(0, len(gene_list), batch_size)]
+        return self._map_concurrent(query_batch, batches, sink)
     
     def _parse_ensembl_response(self, data: dict, gene: str) -> List[Dict[str, str]]:
         """Parse Ensembl API response"""
-        relationships = []
-        
-        if 'seq_region_name' in data:
-            chromosome = f"Chromosome {data['seq_region_name']}"
-            relationships.append({
-                "subject": gene,
-                "predicate": "located_on",
-                "object": chromosome
-            })
-        
-        if 'biotype' in data:
-            relationships.append({
-                "subject": gene,
-                "predicate": "has_biotype",
-                "object": data['biotype']
-            })
-        
-        return relationships
+        return [{"subject": gene, "predicate": predicate, "object": fmt(data[key])}
+                for key, predicate, fmt in ENSEMBL_SCHEMA if key in data]
 
-def save_relationships_to_csv(relationships: List[Dict[str, str]], filename: str):
-    """Save extracted relationships to CSV file"""
-    if relationships:
-        df = pd.DataFrame(relationships)
-        # Remove duplicates
-        df = df.drop_duplicates()
-        df.to_csv(filename, index=False)
-        print(f"Saved {len(df)} unique relationships to {filename}")
-    else:
-        print("No relationships to save")
+class RelationshipWriter(ABC):
+    """Thread-safe sink that streams unique relationships straight to a file"""
+    
+    def __init__(self, filename: str):
+        self.filename = filename
+        self.seen = set()
+        self.total = 0
+        self.counts: Dict[str, int] = {}
+        self.samples: Dict[str, List[Dict[str, str]]] = {}
+        self.predicates: Dict[str, int] = {}
+        self.lock = threading.Lock()
+    
+    def __call__(self, rel: Dict[str, str], source: Optional[str] = None):
+        key = (rel['subject'], rel['predicate'], rel['object'])
+        with self.lock:
+            self.total += 1
+            self.predicates[rel['predicate']] = self.predicates.get(rel['predicate'], 0) + 1
+            if source is not None:
+                self.counts[source] = self.counts.get(source, 0) + 1
+                samples = self.samples.setdefault(source, [])
+                if len(samples) < 3:
+                    samples.append(rel)
+            # Only the dedup key is kept in memory, never the full row list
+            if key not in self.seen:
+                self.seen.add(key)
+                self._write_row(key)
+    
+    @abstractmethod
+    def _write_row(self, row: Tuple[str, str, str]):
+        """Write one new, deduplicated row to the output file"""
+    
+    def for_source(self, source: str) -> Sink:
+        """Sink that also tracks per-database counts and a few sample rows"""
+        return lambda rel: self(rel, source)
+    
+    def close(self):
+        pass
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+class RelationshipCSVWriter(RelationshipWriter):
+    """Relationship sink writing CSV rows as they arrive"""
+    
+    def __init__(self, filename: str):
+        super().__init__(filename)
+        self.file = open(filename, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(RELATIONSHIP_COLUMNS)
+    
+    def _write_row(self, row: Tuple[str, str, str]):
+        self.writer.writerow(row)
+    
+    def close(self):
+        self.file.close()
+
+class RelationshipParquetWriter(RelationshipWriter):
+    """
+    Relationship sink writing zstd-compressed Parquet row groups.
+    The small subject and predicate vocabularies are dictionary encoded.
+    """
+    
+    def __init__(self, filename: str, row_group_size: int = 50_000):
+        super().__init__(filename)
+        self.row_group_size = row_group_size
+        self.buffer: List[Tuple[str, str, str]] = []
+        self.schema = pa.schema([(column, pa.string()) for column in RELATIONSHIP_COLUMNS])
+        self.writer = pq.ParquetWriter(filename, self.schema, compression='zstd',
+                                       use_dictionary=['subject', 'predicate'])
+    
+    def _write_row(self, row: Tuple[str, str, str]):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.row_group_size:
+            self._flush()
+    
+    def _flush(self):
+        columns = list(zip(*self.buffer)) or [()] * len(RELATIONSHIP_COLUMNS)
+        self.writer.write_table(pa.table(dict(zip(RELATIONSHIP_COLUMNS, columns)), schema=self.schema))
+        self.buffer = []
+    
+    def close(self):
+        if self.buffer or not self.seen:
+            self._flush()
+        self.writer.close()
+
+def open_relationship_writer(filename: str) -> RelationshipWriter:
+    """Pick the relationship sink matching the file extension"""
+    if filename.endswith('.parquet'):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required to write Parquet output")
+        return RelationshipParquetWriter(filename)
+    return RelationshipCSVWriter(filename)
 
 def main():
     """Main function to demonstrate database mining"""
+    parser = argparse.ArgumentParser(description="Mine biological databases for maize relationships")
+    parser.add_argument('--format', choices=['parquet', 'csv'],
+                        default='parquet' if PYARROW_AVAILABLE else 'csv',
+                        help="Output format (Parquet loads faster downstream; CSV for compatibility)")
+    args = parser.parse_args()
+    
     print("=== Database Mining for Maize Knowledge Graph ===\n")
     
     miner = DatabaseMiner()
-    all_relationships = []
+    output_file = f"toydata/database_mined.{args.format}"
     
     # Mine from different databases
     databases = [
@@ -321,44 +664,48 @@ def main():
     # Example gene list for protein databases
     gene_list = ["DREB2A", "ZmVPP1", "ZmNF-YB2", "ZmCCT", "ZmDREB1A"]
     
-    for db_name, mining_function in databases:
-        print(f"\n--- Mining {db_name} ---")
-        try:
-            if db_name in ["UniProt", "Ensembl"]:
-                relationships = mining_function(gene_list)
-            else:
-                relationships = mining_function()
-            
-            print(f"Extracted {len(relationships)} relationships from {db_name}")
-            if relationships:
-                for rel in relationships[:3]:  # Show first 3
-                    print(f"  {rel['subject']} --[{rel['predicate']}]--> {rel['object']}")
-                if len(relationships) > 3:
-                    print(f"  ... and {len(relationships) - 3} more")
-            
-            all_relationships.extend(relationships)
-            
-        except Exception as e:
-            print(f"Error mining {db_name}: {e}")
+    def run_miner(db_name, mining_function, sink):
+        if db_name in ["UniProt", "Ensembl"]:
+            return mining_function(gene_list, sink=sink)
+        return mining_function(sink=sink)
     
-    # Save all relationships
-    if all_relationships:
-        output_file = "toydata/database_mined.csv"
-        save_relationships_to_csv(all_relationships, output_file)
+    # Relationships are written as they are mined rather than held in memory
+    with open_relationship_writer(output_file) as writer:
+        # Each database is mined independently, so their network waits overlap
+        with ThreadPoolExecutor(max_workers=len(databases)) as executor:
+            futures = {
+                executor.submit(run_miner, db_name, mining_function, writer.for_source(db_name)): db_name
+                for db_name, mining_function in databases
+            }
+            for future in as_completed(futures):
+                db_name = futures[future]
+                print(f"\n--- Mined {db_name} ---")
+                try:
+                    future.result()
+                    
+                    count = writer.counts.get(db_name, 0)
+                    print(f"Extracted {count} relationships from {db_name}")
+                    for rel in writer.samples.get(db_name, []):  # Show first 3
+                        print(f"  {rel['subject']} --[{rel['predicate']}]--> {rel['object']}")
+                    if count > 3:
+                        print(f"  ... and {count - 3} more")
+                    
+                except Exception as e:
+                    print(f"Error mining {db_name}: {e}")
+    
+    if writer.total:
+        print(f"Saved {len(writer.seen)} unique relationships to {output_file}")
         
         print(f"\n=== Summary ===")
-        print(f"Total relationships extracted: {len(all_relationships)}")
+        print(f"Total relationships extracted: {writer.total}")
         print(f"Saved to: {output_file}")
         
         # Show statistics
-        predicates = {}
-        for rel in all_relationships:
-            pred = rel['predicate']
-            predicates[pred] = predicates.get(pred, 0) + 1
-        
         print(f"\nRelationship types:")
-        for pred, count in sorted(predicates.items()):
+        for pred, count in sorted(writer.predicates.items()):
             print(f"  {pred}: {count}")
+    else:
+        print("No relationships to save")
     
     print(f"\n=== Database Mining Guide ===")
     print("1. MaizeGDB: Curated maize genetics data (web scraping needed)")
@@ -366,7 +713,10 @@ def main():
     print("3. KEGG: Pathway information (REST API available)")
     print("4. UniProt: Protein function data (REST API available)")
     print("5. Ensembl Plants: Genomic annotations (REST API available)")
-    print("\nNext: Run 'python3 expand_maize_kg.py' to add database_mined.csv to your graph")
+    print(f"\nNext: Run 'python3 expand_maize_kg.py' to add {os.path.basename(output_file)} to your graph")
 
 if __name__ == "__main__":
+    if platform.python_implementation() != 'PyPy':
+        print("Hint: the mining loops are pure Python; run under PyPy "
+              "(pypy3 database_mining.py) for a faster interpreter\n")
     main()
@@ -9,17 +9,36 @@ weather data APIs, and soil/climate databases with geospatial indexing.
 import pandas as pd
 import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import logging
-from typing import Dict, List, Optional, Tuple, Any, Union
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 import geopy.distance
 from geopy.geocoders import Nominatim
 import sqlite3
+from scipy.spatial import cKDTree
 from neo4j import GraphDatabase
 from production_schema import ProductionSchema, NodeType, RelationshipType
 
+try:
+    import requests_cache
+    REQUESTS_CACHE_AVAILABLE = True
+except ImportError:
+    REQUESTS_CACHE_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -36,6 +55,8 @@ class GeospatialLocation:
     state_province: Optional[str] = None
     soil_type: Optional[str] = None
     climate_zone: Optional[str] = None
+    # Other site names that resolved to this location
+    aliases: List[str] = field(default_factory=list)
 
 @dataclass
 class WeatherData:
@@ -52,6 +73,62 @@ class WeatherData:
     growing_degree_days: Optional[float] = None
     stress_index: Optional[float] = None
 
+# Per-day weather fields stored as columns in WeatherFrame
+WEATHER_FIELDS = ('temperature_min', 'temperature_max', 'temperature_avg', 'precipitation',
+                  'humidity', 'wind_speed', 'solar_radiation', 'growing_degree_days', 'stress_index')
+# One packed record per day; float32 is ample for weather readings and halves the footprint
+WEATHER_DTYPE = np.dtype([('date', 'datetime64[D]')] + [(name, 'f4') for name in WEATHER_FIELDS])
+
+@dataclass
+class WeatherFrame:
+    """
+    Daily weather series for one location, stored as a structured array of WEATHER_DTYPE
+    (NaN = missing). Columns are available as attributes, e.g. frame.temperature_avg.
+    """
+    location_id: str
+    records: np.ndarray
+    
+    @classmethod
+    def empty(cls, location_id: str) -> 'WeatherFrame':
+        return cls(location_id, np.empty(0, dtype=WEATHER_DTYPE))
+    
+    @classmethod
+    def concat(cls, location_id: str, frames: Iterable['WeatherFrame']) -> 'WeatherFrame':
+        frames = list(frames)
+        if not frames:
+            return cls.empty(location_id)
+        return cls(location_id, np.concatenate([frame.records for frame in frames]))
+    
+    @property
+    def dates(self) -> np.ndarray:
+        return self.records['date']
+    
+    def __getattr__(self, name: str) -> np.ndarray:
+        # Only reached for names that are not regular attributes
+        if name in WEATHER_FIELDS and 'records' in self.__dict__:
+            return self.records[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def __len__(self) -> int:
+        return len(self.records)
+    
+    def __getitem__(self, index: int) -> WeatherData:
+        """Row view of a single day"""
+        values = [getattr(self, name)[index] for name in WEATHER_FIELDS]
+        return WeatherData(
+            self.location_id,
+            pd.Timestamp(self.dates[index]).to_pydatetime(),
+            *(None if np.isnan(value) else float(value) for value in values)
+        )
+    
+    def __iter__(self):
+        # Convert each column once up front rather than per row and per field
+        dates = pd.DatetimeIndex(self.dates).to_pydatetime()
+        columns = [np.where(np.isnan(values), None, values).tolist()
+                   for values in (getattr(self, name) for name in WEATHER_FIELDS)]
+        for date, row in zip(dates, zip(*columns)):
+            yield WeatherData(self.location_id, date, *row)
+
 @dataclass
 class SoilData:
     """Soil characteristics for a location"""
@@ -70,21 +147,146 @@ class SoilData:
 class EnvironmentalProfile:
     """Complete environmental profile for a location"""
     location: GeospatialLocation
-    weather_data: List[WeatherData] = field(default_factory=list)
+    # Daily series, if the caller kept one; process_location streams it and keeps only monthly_weather
+    weather_data: Optional[WeatherFrame] = None
     soil_data: Optional[SoilData] = None
     climate_summary: Dict[str, Any] = field(default_factory=dict)
+    monthly_weather: List[Dict[str, Any]] = field(default_factory=list)
     envo_terms: List[str] = field(default_factory=list)
 
+def mount_pooled_adapter(session: requests.Session, pool_size: int = 32) -> requests.Session:
+    """Reuse pooled keep-alive connections and retry transient failures with backoff"""
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 500, 502, 503, 504],
+                          respect_retry_after_header=True)
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+EARTH_RADIUS_KM = 6371.0088
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+# 8 characters is a cell of roughly 38 m x 19 m
+LOCATION_GEOHASH_PRECISION = 8
+
+def geohash_encode(lat: float, lon: float, precision: int = LOCATION_GEOHASH_PRECISION) -> str:
+    """Standard base-32 geohash of a coordinate"""
+    lat_range, lon_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars, bits, n_bits, even = [], 0, 0, True
+    while len(chars) < precision:
+        # Bits alternate between longitude and latitude, starting with longitude
+        value, bounds = (lon, lon_range) if even else (lat, lat_range)
+        mid = (bounds[0] + bounds[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            bounds[0] = mid
+        else:
+            bounds[1] = mid
+        even = not even
+        n_bits += 1
+        if n_bits == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits, n_bits = 0, 0
+    return ''.join(chars)
+
+def location_key(lat: float, lon: float) -> str:
+    """Canonical location_id: coordinates in the same geohash cell share one Location"""
+    return f"loc_{geohash_encode(lat, lon)}"
+
+def _unit_vectors(lat, lon) -> np.ndarray:
+    """Project latitude/longitude (degrees) onto the unit sphere"""
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+class LocationIndex:
+    """
+    KD-tree over locations for nearest-neighbour and radius queries.
+    Points live on the unit sphere, so chord distance ranks exactly like great-circle
+    distance; candidates are then refined with geodesic distances from geopy.
+    """
+    
+    def __init__(self, locations: List[GeospatialLocation]):
+        self.locations = list(locations)
+        points = _unit_vectors([l.latitude for l in self.locations],
+                               [l.longitude for l in self.locations])
+        self.tree = cKDTree(points.reshape(-1, 3))
+    
+    def __len__(self) -> int:
+        return len(self.locations)
+    
+    def _refine(self, lat: float, lon: float, indices) -> List[Tuple[GeospatialLocation, float]]:
+        matches = [
+            (self.locations[i],
+             geopy.distance.geodesic((lat, lon), (self.locations[i].latitude, self.locations[i].longitude)).km)
+            for i in indices
+        ]
+        return sorted(matches, key=lambda match: match[1])
+    
+    def nearest(self, lat: float, lon: float, k: int = 1) -> List[Tuple[GeospatialLocation, float]]:
+        """The k closest locations with their distances in km"""
+        if not self.locations:
+            return []
+        # Over-fetch, since the sphere ordering can differ slightly from geodesic ordering
+        n_candidates = min(len(self.locations), k * 4)
+        _, indices = self.tree.query(_unit_vectors(lat, lon), k=n_candidates)
+        return self._refine(lat, lon, np.atleast_1d(indices))[:k]
+    
+    def within(self, lat: float, lon: float, radius_km: float) -> List[Tuple[GeospatialLocation, float]]:
+        """All locations within radius_km, closest first"""
+        if not self.locations:
+            return []
+        # Search a slightly larger chord to cover the sphere/ellipsoid difference
+        chord = 2 * np.sin(min(np.pi, radius_km * 1.01 / EARTH_RADIUS_KM) / 2)
+        indices = self.tree.query_ball_point(_unit_vectors(lat, lon), chord)
+        return [match for match in self._refine(lat, lon, indices) if match[1] <= radius_km]
+
 class ENVOClient:
     """Client for interacting with Environmental Ontology (ENVO)"""
     
-    def __init__(self):
+    def __init__(self, max_workers: int = 8, cache_name: Optional[str] = 'envo_cache',
+                 cache_expire_after: timedelta = timedelta(days=30)):
         self.base_url = "https://www.ebi.ac.uk/ols/api/ontologies/envo"
-        self.session = requests.Session()
+        # ENVO terms change rarely, so responses persist on disk across runs
+        self.cache_name = cache_name if REQUESTS_CACHE_AVAILABLE else None
+        self.cache_expire_after = cache_expire_after
+        self.session = self._new_session()
         self.cache = {}
+        self.max_workers = max_workers
+        self._local = threading.local()
+        # The same ENVO terms recur across locations, so details are memoized per client
+        self._term_details_cached = lru_cache(maxsize=8192)(self._fetch_term_details)
     
-    def search_environmental_terms(self, query: str) -> List[Dict[str, Any]]:
-        """Search for environmental terms in ENVO"""
+    def _new_session(self) -> requests.Session:
+        if self.cache_name:
+            session = requests_cache.CachedSession(self.cache_name, backend='sqlite',
+                                                   expire_after=self.cache_expire_after)
+        else:
+            session = requests.Session()
+        return mount_pooled_adapter(session)
+    
+    def _thread_session(self) -> requests.Session:
+        """requests.Session is not thread-safe, so each worker thread gets its own"""
+        if threading.current_thread() is threading.main_thread():
+            return self.session
+        if not hasattr(self._local, 'session'):
+            self._local.session = self._new_session()
+        return self._local.session
+    
+    def map_concurrent(self, func, items: List[Any]) -> List[Any]:
+        """Run a lookup over items on a thread pool, keeping input order"""
+        items = list(items)
+        if len(items) <= 1:
+            return [func(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(items))) as executor:
+            return list(executor.map(func, items))
+    
+    def search_environmental_terms(self, query: str) -> Optional[List[Dict[str, Any]]]:
+        """Search for environmental terms in ENVO; None if the search failed"""
         if query in self.cache:
             return self.cache[query]
         
@@ -96,7 +298,7 @@ class ENVOClient:
                 'size': 20
             }
             
-            response = self.session.get(url, params=params, timeout=10)
+            response = self._thread_session().get(url, params=params, timeout=10)
             response.raise_for_status()
             
             results = response.json().get('_embedded', {}).get('terms', [])
@@ -105,38 +307,92 @@ class ENVOClient:
             
         except Exception as e:
             logger.warning(f"Failed to search ENVO for '{query}': {e}")
-            return []
+            return None
     
     def get_term_details(self, term_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about an ENVO term"""
+        # Extract term ID from IRI if needed, so IRI and bare-id lookups share a cache slot
+        if 'ENVO_' in term_id:
+            term_id = term_id.split('/')[-1]
+        
         try:
-            # Extract term ID from IRI if needed
-            if 'ENVO_' in term_id:
-                term_id = term_id.split('/')[-1]
-            
-            url = f"{self.base_url}/terms/{term_id}"
-            response = self.session.get(url, timeout=10)
-            response.raise_for_status()
-            
-            return response.json()
+            return self._term_details_cached(term_id)
             
         except Exception as e:
             logger.warning(f"Failed to get ENVO term details for '{term_id}': {e}")
             return None
+    
+    def _fetch_term_details(self, term_id: str) -> Dict[str, Any]:
+        """Fetch one term; failures raise so lru_cache never stores them"""
+        url = f"{self.base_url}/terms/{term_id}"
+        response = self._thread_session().get(url, timeout=10)
+        response.raise_for_status()
+        
+        return response.json()
+
+TWO_PI_OVER_YEAR = 2 * np.pi / 365.25
+GDD_BASE_TEMP = 10.0
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _derived_weather_kernel(temp_max, temp_avg, gdd, stress):
+        # One fused pass; NaN inputs stay NaN like the NumPy fallback
+        for i in range(temp_avg.shape[0]):
+            avg = temp_avg[i]
+            heat = temp_max[i] - 35.0
+            gdd[i] = avg - GDD_BASE_TEMP if avg > GDD_BASE_TEMP or np.isnan(avg) else 0.0
+            if np.isnan(avg) or np.isnan(heat):
+                stress[i] = np.nan
+            else:
+                stress[i] = min(1.0, max(0.0, heat) * 0.1 + max(0.0, 5.0 - avg) * 0.1)
+
+def compute_derived(temp_max: np.ndarray, temp_avg: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Growing degree days (base 10°C) and stress index for daily temperature arrays"""
+    if not NUMBA_AVAILABLE:
+        gdd = np.maximum(0, temp_avg - GDD_BASE_TEMP)
+        return gdd, WeatherAPIClient._calculate_stress_index(temp_avg, temp_max)
+    
+    temp_max = np.ascontiguousarray(temp_max, dtype=np.float64)
+    temp_avg = np.ascontiguousarray(temp_avg, dtype=np.float64)
+    gdd = np.empty_like(temp_avg)
+    stress = np.empty_like(temp_avg)
+    _derived_weather_kernel(temp_max, temp_avg, gdd, stress)
+    return gdd, stress
 
 class WeatherAPIClient:
     """Client for weather data APIs (OpenWeatherMap, NOAA, etc.)"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, seed=None):
         self.api_key = api_key
-        self.session = requests.Session()
+        self.session = mount_pooled_adapter(requests.Session())
         
         # Mock weather data for demonstration
         self.mock_data = True
+        # PCG64 generator owned by this client (seed may be an int, SeedSequence or Generator)
+        self.rng = np.random.default_rng(seed)
+    
+    def spawn(self, n: int) -> List['WeatherAPIClient']:
+        """Independent child clients, e.g. one per worker for parallel weather generation"""
+        return [WeatherAPIClient(self.api_key, seed=child) for child in self.rng.spawn(n)]
     
     def get_historical_weather(self, lat: float, lon: float, 
-                             start_date: datetime, end_date: datetime) -> List[WeatherData]:
+                             start_date: datetime, end_date: datetime) -> WeatherFrame:
         """Get historical weather data for location and date range"""
+        return WeatherFrame.concat(location_key(lat, lon),
+                                   self.iter_historical_weather(lat, lon, start_date, end_date))
+    
+    def iter_historical_weather(self, lat: float, lon: float,
+                                start_date: datetime, end_date: datetime) -> Iterator[WeatherFrame]:
+        """Yield historical weather one calendar month at a time, so memory stays bounded"""
+        start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+        month_starts = pd.date_range(start, end, freq='MS')
+        edges = [start, *month_starts[month_starts > start], end + pd.Timedelta(days=1)]
+        
+        for month_start, next_start in zip(edges, edges[1:]):
+            yield self._get_weather_chunk(lat, lon, month_start, next_start - pd.Timedelta(days=1))
+    
+    def _get_weather_chunk(self, lat: float, lon: float,
+                           start_date: datetime, end_date: datetime) -> WeatherFrame:
         if self.mock_data:
             return self._generate_mock_weather_data(lat, lon, start_date, end_date)
         
@@ -150,91 +406,130 @@ class WeatherAPIClient:
         #     'appid': self.api_key
         # }
         
-        return []
+        return WeatherFrame.empty(location_key(lat, lon))
     
     def _generate_mock_weather_data(self, lat: float, lon: float,
-                                  start_date: datetime, end_date: datetime) -> List[WeatherData]:
-        """Generate mock weather data for demonstration"""
-        weather_data = []
-        current_date = start_date
+                                  start_date: datetime, end_date: datetime) -> WeatherFrame:
+        """Generate mock weather data for demonstration (vectorized over the whole date range)"""
+        location_id = location_key(lat, lon)
+        dates = pd.date_range(start_date, end_date, freq='D')
+        n_days = len(dates)
+        if n_days == 0:
+            return WeatherFrame.empty(location_id)
         
         # Base temperature varies by latitude (rough approximation)
         base_temp = 25 - abs(lat) * 0.5
         
-        while current_date <= end_date:
-            # Simulate seasonal variation
-            day_of_year = current_date.timetuple().tm_yday
-            seasonal_factor = np.sin(2 * np.pi * day_of_year / 365.25)
-            
-            temp_avg = base_temp + seasonal_factor * 10 + np.random.normal(0, 3)
-            temp_min = temp_avg - np.random.uniform(5, 10)
-            temp_max = temp_avg + np.random.uniform(5, 10)
-            
-            # Calculate growing degree days (base 10°C)
-            gdd = max(0, temp_avg - 10)
-            
-            weather = WeatherData(
-                location_id=f"loc_{lat}_{lon}",
-                date=current_date,
-                temperature_min=temp_min,
-                temperature_max=temp_max,
-                temperature_avg=temp_avg,
-                precipitation=max(0, np.random.exponential(2)),
-                humidity=np.random.uniform(40, 90),
-                wind_speed=np.random.exponential(3),
-                solar_radiation=np.random.uniform(15, 25),
-                growing_degree_days=gdd,
-                stress_index=self._calculate_stress_index(temp_avg, temp_max)
-            )
-            
-            weather_data.append(weather)
-            current_date += timedelta(days=1)
-        
-        return weather_data
+        # Simulate seasonal variation
+        seasonal_factor = np.sin(TWO_PI_OVER_YEAR * dates.dayofyear.to_numpy())
+        
+        temp_avg = base_temp + seasonal_factor * 10 + self.rng.normal(0, 3, n_days)
+        temp_min = temp_avg - self.rng.uniform(5, 10, n_days)
+        temp_max = temp_avg + self.rng.uniform(5, 10, n_days)
+        precipitation = self.rng.exponential(2, n_days)
+        humidity = self.rng.uniform(40, 90, n_days)
+        wind_speed = self.rng.exponential(3, n_days)
+        solar_radiation = self.rng.uniform(15, 25, n_days)
+        
+        # Growing degree days and stress index in one fused pass
+        gdd, stress_index = compute_derived(temp_max, temp_avg)
+        
+        records = np.empty(n_days, dtype=WEATHER_DTYPE)
+        records['date'] = dates.to_numpy()
+        records['temperature_min'] = temp_min
+        records['temperature_max'] = temp_max
+        records['temperature_avg'] = temp_avg
+        records['precipitation'] = precipitation
+        records['humidity'] = humidity
+        records['wind_speed'] = wind_speed
+        records['solar_radiation'] = solar_radiation
+        records['growing_degree_days'] = gdd
+        records['stress_index'] = stress_index
+        return WeatherFrame(location_id, records)
     
-    def _calculate_stress_index(self, temp_avg: float, temp_max: float) -> float:
-        """Calculate environmental stress index"""
+    @staticmethod
+    def _calculate_stress_index(temp_avg: np.ndarray, temp_max: np.ndarray) -> np.ndarray:
+        """Calculate environmental stress index (element-wise over arrays or scalars)"""
         # Simple stress index based on temperature extremes
-        heat_stress = max(0, temp_max - 35) * 0.1
-        cold_stress = max(0, 5 - temp_avg) * 0.1
-        return min(1.0, heat_stress + cold_stress)
+        heat_stress = np.maximum(0, temp_max - 35) * 0.1
+        cold_stress = np.maximum(0, 5 - temp_avg) * 0.1
+        return np.minimum(1.0, heat_stress + cold_stress)
+
+SOIL_TYPES = np.array(['Clay', 'Sandy loam', 'Silt loam', 'Loam', 'Sandy clay'])
+DRAINAGE_TYPES = np.array(['Well-drained', 'Moderately drained', 'Poorly drained'])
+
+# ENVO searches whose results are shared by every profile
+ENVO_PRESET_QUERIES = (
+    'tropical climate', 'temperate climate', 'cold climate',
+    'arid environment', 'semi-arid environment', 'humid environment',
+) + tuple(f"{soil_type} soil" for soil_type in SOIL_TYPES)
 
 class SoilDataClient:
     """Client for soil data from various sources"""
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, seed=None):
+        self.session = mount_pooled_adapter(requests.Session())
+        self.rng = np.random.default_rng(seed)
     
     def get_soil_data(self, lat: float, lon: float) -> Optional[SoilData]:
         """Get soil data for a location"""
+        row = self.get_soil_data_bulk([lat], [lon]).iloc[0]
+        return SoilData(**{key: value.item() if hasattr(value, 'item') else value
+                           for key, value in row.items()})
+    
+    def get_soil_data_bulk(self, lats, lons) -> pd.DataFrame:
+        """Get soil data for many locations at once, one row per location (SoilData columns)"""
         # Mock soil data for demonstration
         # Real implementation would query SoilGrids, USDA SSURGO, etc.
-        
-        soil_types = ['Clay', 'Sandy loam', 'Silt loam', 'Loam', 'Sandy clay']
-        drainage_types = ['Well-drained', 'Moderately drained', 'Poorly drained']
-        
-        return SoilData(
-            location_id=f"loc_{lat}_{lon}",
-            soil_type=np.random.choice(soil_types),
-            ph=np.random.uniform(5.5, 8.0),
-            organic_matter=np.random.uniform(1.0, 5.0),
-            nitrogen=np.random.uniform(10, 50),
-            phosphorus=np.random.uniform(5, 30),
-            potassium=np.random.uniform(50, 200),
-            texture=np.random.choice(soil_types),
-            drainage=np.random.choice(drainage_types),
-            depth=np.random.uniform(50, 150)
-        )
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        n = len(lats)
+        
+        return pd.DataFrame({
+            'location_id': [location_key(lat, lon) for lat, lon in zip(lats.tolist(), lons.tolist())],
+            'soil_type': self.rng.choice(SOIL_TYPES, n),
+            'ph': self.rng.uniform(5.5, 8.0, n),
+            'organic_matter': self.rng.uniform(1.0, 5.0, n),
+            'nitrogen': self.rng.uniform(10, 50, n),
+            'phosphorus': self.rng.uniform(5, 30, n),
+            'potassium': self.rng.uniform(50, 200, n),
+            'texture': self.rng.choice(SOIL_TYPES, n),
+            'drainage': self.rng.choice(DRAINAGE_TYPES, n),
+            'depth': self.rng.uniform(50, 150, n)
+        })
+
+# How per-month partials from separate chunks of the same month are merged
+MONTHLY_PARTIAL_COMBINE = {
+    'temp_sum': 'sum', 'temp_count': 'sum', 'temp_low': 'min', 'temp_high': 'max',
+    'temperature_min': 'min', 'temperature_max': 'max',
+    'precip_sum': 'sum', 'precip_count': 'sum', 'gdd_sum': 'sum', 'gdd_count': 'sum',
+    'stress_days': 'sum', 'frost_days': 'sum'
+}
+# Monthly weather rows written per UNWIND statement
+WEATHER_BATCH_SIZE = 1000
 
 class EnvironmentalIntegrator:
     """Integrates environmental data into the knowledge graph"""
     
-    def __init__(self, neo4j_driver: GraphDatabase.driver):
+    def __init__(self, neo4j_driver: GraphDatabase.driver, dedupe_radius_km: Optional[float] = None,
+                 seed: Optional[int] = None):
         self.driver = neo4j_driver
+        # Opt-in: locations closer than this reuse an existing Location node
+        self.dedupe_radius_km = dedupe_radius_km
+        self.locations: List[GeospatialLocation] = []
+        self._locations_by_id: Dict[str, GeospatialLocation] = {}
+        self._location_index: Optional[LocationIndex] = None
+        # Weather rollups and soil per canonical location, so duplicate sites are fetched once
+        self._weather_by_location: Dict[Tuple[str, datetime, datetime], Tuple[Dict[str, Any], List[Dict[str, Any]]]] = {}
+        self._soil_by_location: Dict[str, Optional[SoilData]] = {}
         self.schema = ProductionSchema()
         self.envo_client = ENVOClient()
-        self.weather_client = WeatherAPIClient()
-        self.soil_client = SoilDataClient()
+        self._envo_iris: Dict[str, List[str]] = {}
+        self._envo_lock = threading.Lock()
+        # Independent random streams per client; a fixed seed makes mock data reproducible
+        weather_seed, soil_seed = np.random.SeedSequence(seed).spawn(2)
+        self.weather_client = WeatherAPIClient(seed=weather_seed)
+        self.soil_client = SoilDataClient(seed=soil_seed)
         self.geocoder = Nominatim(user_agent="kg_environmental_integrator")
     
     def process_location(self, location_name: str, lat: float, lon: float,
@@ -242,140 +537,322 @@ class EnvironmentalIntegrator:
         """Process environmental data for a location"""
         logger.info(f"Processing environmental data for {location_name}")
         
-        # Create geospatial location
+        # Reuse a known location when these coordinates are (nearly) the same site
+        location = self.find_nearby_location(lat, lon)
+        is_new = location is None
+        if is_new:
+            location = self._new_location(location_name, lat, lon)
+        else:
+            logger.info(f"{location_name} matches existing location {location.name} ({location.location_id}); reusing it")
+            if location_name != location.name and location_name not in location.aliases:
+                location.aliases.append(location_name)
+        
+        # Data is fetched for the canonical location, once per site
+        site_lat, site_lon = location.latitude, location.longitude
+        weather_key = (location.location_id, start_date, end_date)
+        weather = self._weather_by_location.get(weather_key)
+        fetch_soil = location.location_id not in self._soil_by_location
+        
+        # Geocoding and the soil lookup are independent of the weather, so they run
+        # alongside it and the location costs roughly the slowest of the three
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            geocode_future = executor.submit(self._geocode_location, location) if is_new else None
+            soil_future = executor.submit(self.soil_client.get_soil_data, site_lat, site_lon) if fetch_soil else None
+            
+            if weather is None:
+                # Stream weather month by month; only the monthly rollups are kept
+                weather_chunks = self.weather_client.iter_historical_weather(site_lat, site_lon, start_date, end_date)
+                weather = self._weather_by_location[weather_key] = self._summarize_weather(weather_chunks)
+            
+            if soil_future is not None:
+                self._soil_by_location[location.location_id] = soil_future.result()
+            if geocode_future is not None:
+                geocode_future.result()
+        
+        climate_summary, monthly_weather = weather
+        soil_data = self._soil_by_location[location.location_id]
+        
+        # Find relevant ENVO terms
+        envo_terms = self._find_envo_terms(location, climate_summary, soil_data)
+        
+        return EnvironmentalProfile(
+            location=location,
+            soil_data=soil_data,
+            climate_summary=climate_summary,
+            monthly_weather=monthly_weather,
+            envo_terms=envo_terms
+        )
+    
+    def _new_location(self, location_name: str, lat: float, lon: float) -> GeospatialLocation:
+        """Create and register a new geospatial location"""
         location = GeospatialLocation(
-            location_id=f"loc_{location_name.lower().replace(' ', '_')}",
+            location_id=location_key(lat, lon),
             name=location_name,
             latitude=lat,
             longitude=lon
         )
         
-        # Enhance location with geocoding
+        self.locations.append(location)
+        self._locations_by_id[location.location_id] = location
+        self._location_index = None  # Rebuilt lazily on the next lookup
+        return location
+    
+    def _geocode_location(self, location: GeospatialLocation) -> None:
+        """Enhance location with reverse geocoding (country, state)"""
         try:
-            geocoded = self.geocoder.reverse(f"{lat}, {lon}")
+            geocoded = self.geocoder.reverse(f"{location.latitude}, {location.longitude}")
             if geocoded:
                 address = geocoded.raw.get('address', {})
                 location.country = address.get('country')
                 location.state_province = address.get('state')
         except Exception as e:
-            logger.warning(f"Geocoding failed for {location_name}: {e}")
-        
-        # Get weather data
-        weather_data = self.weather_client.get_historical_weather(lat, lon, start_date, end_date)
-        
-        # Get soil data
-        soil_data = self.soil_client.get_soil_data(lat, lon)
-        
-        # Calculate climate summary
-        climate_summary = self._calculate_climate_summary(weather_data)
-        
-        # Find relevant ENVO terms
-        envo_terms = self._find_envo_terms(location, climate_summary, soil_data)
+            logger.warning(f"Geocoding failed for {location.name}: {e}")
+    
+    @property
+    def location_index(self) -> LocationIndex:
+        if self._location_index is None:
+            self._location_index = LocationIndex(self.locations)
+        return self._location_index
+    
+    def find_nearby_location(self, lat: float, lon: float) -> Optional[GeospatialLocation]:
+        """Registered location in the same geohash cell, else the closest within the dedupe radius"""
+        location = self._locations_by_id.get(location_key(lat, lon))
+        if location is not None or not self.dedupe_radius_km or not self.locations:
+            return location
+        matches = self.location_index.within(lat, lon, self.dedupe_radius_km)
+        return matches[0][0] if matches else None
+    
+    def _summarize_weather(self, weather_data: Union[WeatherFrame, Iterable[WeatherFrame], None]
+                           ) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Calculate the climate summary and the monthly weather rollups together.
+        Accepts one daily series or a stream of chunks (e.g. iter_historical_weather);
+        each chunk is grouped by month as it arrives, and the overall statistics are
+        then combined from the per-month partial sums, counts and extremes.
+        """
+        if weather_data is None:
+            return {}, []
+        frames = [weather_data] if isinstance(weather_data, WeatherFrame) else weather_data
+        
+        location_id = None
+        partials = []
+        for frame in frames:
+            if len(frame):
+                location_id = frame.location_id
+                partials.append(self._monthly_partials(frame))
+        if not partials:
+            return {}, []
+        
+        parts = pd.concat(partials)
+        if not parts.index.is_unique:
+            # Chunks that split a month are merged back into one partial per month
+            parts = parts.groupby(level=0).agg(MONTHLY_PARTIAL_COMBINE)
+        
+        # Overall climate summary from the monthly partials
+        temp_count = int(parts['temp_count'].sum())
+        precip_count = int(parts['precip_count'].sum())
+        climate_summary = {
+            'temperature_mean': float(parts['temp_sum'].sum() / temp_count) if temp_count else None,
+            'temperature_min': float(parts['temp_low'].min()) if temp_count else None,
+            'temperature_max': float(parts['temp_high'].max()) if temp_count else None,
+            'precipitation_total': float(parts['precip_sum'].sum()) if precip_count else None,
+            'precipitation_mean': float(parts['precip_sum'].sum() / precip_count) if precip_count else None,
+            'growing_degree_days_total': float(parts['gdd_sum'].sum()) if parts['gdd_count'].any() else None,
+            'frost_days': int(parts['frost_days'].sum()),
+            'heat_stress_days': int(parts['stress_days'].sum())
+        }
         
-        return EnvironmentalProfile(
-            location=location,
-            weather_data=weather_data,
-            soil_data=soil_data,
-            climate_summary=climate_summary,
-            envo_terms=envo_terms
+        # Monthly rollups; months with no observations of a field leave it None
+        monthly = pd.DataFrame({
+            'temperature_avg': parts['temp_sum'] / parts['temp_count'].where(parts['temp_count'] > 0),
+            'temperature_min': parts['temperature_min'],
+            'temperature_max': parts['temperature_max'],
+            'stress_days': parts['stress_days'],
+            'precipitation_total': parts['precip_sum'].where(parts['precip_count'] > 0),
+            'growing_degree_days': parts['gdd_sum'].where(parts['gdd_count'] > 0)
+        })
+        # NaN aggregates become None so Neo4j leaves those properties unset
+        monthly = monthly.astype(object).where(monthly.notna(), None)
+        
+        monthly_rows = []
+        for month, summary in zip(monthly.index, monthly.to_dict('records')):
+            year, month_of_year = divmod(int(month), 12)
+            month_key = f"{1970 + year}-{month_of_year + 1:02d}"
+            monthly_rows.append({
+                'weather_id': f"weather_{location_id}_{month_key}",
+                'location_id': location_id,
+                'month': month_key,
+                **summary
+            })
+        
+        return climate_summary, monthly_rows
+    
+    @staticmethod
+    def _monthly_partials(weather_data: WeatherFrame) -> pd.DataFrame:
+        """Per-month partial sums, counts and extremes of one daily series"""
+        temps = weather_data.temperature_avg
+        # Group by an integer month bucket (months since 1970-01);
+        # the YYYY-MM string is only formatted once per month in _summarize_weather
+        daily = pd.DataFrame({
+            'month': weather_data.dates.astype('datetime64[M]').astype(np.int64),
+            'temperature_avg': temps,
+            'temperature_min': weather_data.temperature_min,
+            'temperature_max': weather_data.temperature_max,
+            'precipitation': weather_data.precipitation,
+            'growing_degree_days': weather_data.growing_degree_days,
+            'stressed': weather_data.stress_index > 0.5,
+            'frost': temps < 0
+        })
+        return daily.groupby('month').agg(
+            temp_sum=('temperature_avg', 'sum'),
+            temp_count=('temperature_avg', 'count'),
+            temp_low=('temperature_avg', 'min'),
+            temp_high=('temperature_avg', 'max'),
+            temperature_min=('temperature_min', 'min'),
+            temperature_max=('temperature_max', 'max'),
+            precip_sum=('precipitation', 'sum'),
+            precip_count=('precipitation', 'count'),
+            gdd_sum=('growing_degree_days', 'sum'),
+            gdd_count=('growing_degree_days', 'count'),
+            stress_days=('stressed', 'sum'),
+            frost_days=('frost', 'sum')
         )
     
-    def _calculate_climate_summary(self, weather_data: List[WeatherData]) -> Dict[str, Any]:
-        """Calculate climate summary statistics"""
-        if not weather_data:
-            return {}
-        
-        temps = [w.temperature_avg for w in weather_data if w.temperature_avg is not None]
-        precip = [w.precipitation for w in weather_data if w.precipitation is not None]
-        gdd = [w.growing_degree_days for w in weather_data if w.growing_degree_days is not None]
-        
-        return {
-            'temperature_mean': np.mean(temps) if temps else None,
-            'temperature_min': np.min(temps) if temps else None,
-            'temperature_max': np.max(temps) if temps else None,
-            'precipitation_total': np.sum(precip) if precip else None,
-            'precipitation_mean': np.mean(precip) if precip else None,
-            'growing_degree_days_total': np.sum(gdd) if gdd else None,
-            'frost_days': len([t for t in temps if t < 0]) if temps else 0,
-            'heat_stress_days': len([w for w in weather_data if w.stress_index and w.stress_index > 0.5])
-        }
+    def _envo_query_iris(self, queries: List[str]) -> Dict[str, List[str]]:
+        """
+        Non-empty term IRIs for each ENVO query. The fixed climate, precipitation and
+        soil queries are loaded together on first use; each query is searched only once
+        per integrator. Failed searches are not remembered, so they are retried for the
+        next location and return no IRIs for this one.
+        """
+        with self._envo_lock:
+            if not self._envo_iris:
+                queries = list(ENVO_PRESET_QUERIES) + list(queries)
+            missing = [query for query in dict.fromkeys(queries) if query not in self._envo_iris]
+            if missing:
+                # The searches are independent, so run them concurrently
+                results = self.envo_client.map_concurrent(self.envo_client.search_environmental_terms, missing)
+                for query, terms in zip(missing, results):
+                    if terms is not None:
+                        self._envo_iris[query] = [iri for term in terms if (iri := term.get('iri'))]
+            return self._envo_iris
     
     def _find_envo_terms(self, location: GeospatialLocation, 
                         climate_summary: Dict[str, Any], 
                         soil_data: Optional[SoilData]) -> List[str]:
         """Find relevant ENVO terms for the environmental conditions"""
-        envo_terms = []
+        # (query, number of top terms to keep) for each applicable search
+        searches = []
         
         # Search for climate-related terms
         if climate_summary.get('temperature_mean'):
             temp_mean = climate_summary['temperature_mean']
             if temp_mean > 25:
-                terms = self.envo_client.search_environmental_terms("tropical climate")
+                searches.append(("tropical climate", 3))
             elif temp_mean > 15:
-                terms = self.envo_client.search_environmental_terms("temperate climate")
+                searches.append(("temperate climate", 3))
             else:
-                terms = self.envo_client.search_environmental_terms("cold climate")
-            
-            envo_terms.extend([term.get('iri', '') for term in terms[:3]])
+                searches.append(("cold climate", 3))
         
         # Search for soil-related terms
         if soil_data and soil_data.soil_type:
-            soil_terms = self.envo_client.search_environmental_terms(f"{soil_data.soil_type} soil")
-            envo_terms.extend([term.get('iri', '') for term in soil_terms[:2]])
+            searches.append((f"{soil_data.soil_type} soil", 2))
         
         # Search for precipitation-related terms
         if climate_summary.get('precipitation_total'):
             precip_total = climate_summary['precipitation_total']
             if precip_total < 300:
-                terms = self.envo_client.search_environmental_terms("arid environment")
+                searches.append(("arid environment", 2))
             elif precip_total > 1500:
-                terms = self.envo_client.search_environmental_terms("humid environment")
+                searches.append(("humid environment", 2))
             else:
-                terms = self.envo_client.search_environmental_terms("semi-arid environment")
-            
-            envo_terms.extend([term.get('iri', '') for term in terms[:2]])
+                searches.append(("semi-arid environment", 2))
+        
+        # Fixed queries come from the preloaded table; anything else is searched once and remembered
+        iris_by_query = self._envo_query_iris([query for query, _ in searches])
+        
+        envo_terms = []
+        for query, limit in searches:
+            envo_terms.extend(iris_by_query.get(query, [])[:limit])
+        
+        return list(dict.fromkeys(envo_terms))  # Remove duplicates, keeping order
+    
+    @contextmanager
+    def _session(self, session=None):
+        """Yield the caller's session, or open (and close) a fresh one"""
+        if session is not None:
+            yield session
+        else:
+            with self.driver.session() as new_session:
+                yield new_session
+    
+    def find_locations_near(self, lat: float, lon: float, radius_km: float, session=None) -> List[Dict[str, Any]]:
+        """Location nodes within radius_km, served by the location_coord_point index"""
+        query = """
+        MATCH (l:Location)
+        WHERE point.distance(l.coord, point({latitude: $latitude, longitude: $longitude, crs: 'wgs-84'})) < $radius_m
+        RETURN l.location_id AS location_id, l.name AS name,
+               point.distance(l.coord, point({latitude: $latitude, longitude: $longitude, crs: 'wgs-84'})) / 1000.0 AS distance_km
+        ORDER BY distance_km
+        """
         
-        return list(set(envo_terms))  # Remove duplicates
+        with self._session(session) as session:
+            result = session.run(query, latitude=lat, longitude=lon, radius_m=radius_km * 1000.0)
+            return [record.data() for record in result]
     
-    def integrate_environmental_profile(self, profile: EnvironmentalProfile) -> None:
-        """Integrate environmental profile into knowledge graph"""
+    def integrate_environmental_profile(self, profile: EnvironmentalProfile, session=None) -> None:
+        """
+        Integrate environmental profile into knowledge graph.
+        Pass an open session to reuse it across several profiles.
+        """
         logger.info(f"Integrating environmental profile for {profile.location.name}")
         
+        # Gather everything (including remote ENVO lookups) before opening the transaction
+        weather_rows = profile.monthly_weather or self._summarize_weather(profile.weather_data)[1]
+        envo_rows = self._envo_term_rows(profile)
+        
+        # One transaction for the whole profile
+        with self._session(session) as session:
+            session.execute_write(self._integrate_all, profile, weather_rows, envo_rows)
+    
+    def _integrate_all(self, tx, profile: EnvironmentalProfile,
+                       weather_rows: List[Dict[str, Any]], envo_rows: List[Dict[str, Any]]) -> None:
+        """Write every node and relationship of a profile inside one transaction"""
         # Create location node
-        self._create_location_node(profile.location)
+        self._create_location_node(tx, profile.location)
         
         # Create environment node with climate summary
-        self._create_environment_node(profile)
+        self._create_environment_node(tx, profile)
         
         # Create weather data nodes (aggregated by month for efficiency)
-        self._create_weather_nodes(profile.weather_data)
+        self._create_weather_nodes(tx, weather_rows)
         
         # Create soil data node
         if profile.soil_data:
-            self._create_soil_node(profile.soil_data)
+            self._create_soil_node(tx, profile.soil_data)
         
         # Create ENVO term nodes and relationships
-        self._create_envo_relationships(profile)
+        self._create_envo_relationships(tx, profile, envo_rows)
     
-    def _create_location_node(self, location: GeospatialLocation) -> None:
+    def _create_location_node(self, tx, location: GeospatialLocation) -> None:
         """Create location node with geospatial properties"""
         query = """
         MERGE (l:Location {location_id: $location_id})
         SET l.name = $name,
             l.latitude = $latitude,
             l.longitude = $longitude,
+            l.coord = point({latitude: $latitude, longitude: $longitude, crs: 'wgs-84'}),
             l.elevation = $elevation,
             l.country = $country,
             l.state_province = $state_province,
             l.soil_type = $soil_type,
-            l.climate_zone = $climate_zone
-        RETURN l
+            l.climate_zone = $climate_zone,
+            l.aliases = $aliases
         """
         
-        with self.driver.session() as session:
-            session.run(query, **location.__dict__)
+        tx.run(query, **location.__dict__)
     
-    def _create_environment_node(self, profile: EnvironmentalProfile) -> None:
+    def _create_environment_node(self, tx, profile: EnvironmentalProfile) -> None:
         """Create environment node with climate summary"""
         env_data = {
             'environment_id': f"env_{profile.location.location_id}",
@@ -390,110 +867,77 @@ class EnvironmentalIntegrator:
         WITH e
         MATCH (l:Location {location_id: $location_id})
         MERGE (e)-[:LOCATED_AT]->(l)
-        RETURN e
         """
         
-        with self.driver.session() as session:
-            session.run(query, env_data=env_data, location_id=profile.location.location_id)
+        tx.run(query, environment_id=env_data['environment_id'], env_data=env_data,
+               location_id=profile.location.location_id)
     
-    def _create_weather_nodes(self, weather_data: List[WeatherData]) -> None:
-        """Create aggregated weather nodes (monthly summaries)"""
-        if not weather_data:
-            return
-        
-        # Group by month for efficiency
-        monthly_data = {}
-        for weather in weather_data:
-            month_key = weather.date.strftime('%Y-%m')
-            if month_key not in monthly_data:
-                monthly_data[month_key] = []
-            monthly_data[month_key].append(weather)
-        
-        # Create monthly weather nodes
-        for month_key, month_weather in monthly_data.items():
-            self._create_monthly_weather_node(month_key, month_weather)
-    
-    def _create_monthly_weather_node(self, month_key: str, weather_data: List[WeatherData]) -> None:
-        """Create a monthly weather summary node"""
-        if not weather_data:
-            return
-        
-        # Calculate monthly averages
-        temps_avg = [w.temperature_avg for w in weather_data if w.temperature_avg is not None]
-        temps_min = [w.temperature_min for w in weather_data if w.temperature_min is not None]
-        temps_max = [w.temperature_max for w in weather_data if w.temperature_max is not None]
-        precip = [w.precipitation for w in weather_data if w.precipitation is not None]
-        gdd = [w.growing_degree_days for w in weather_data if w.growing_degree_days is not None]
-        
-        weather_summary = {
-            'weather_id': f"weather_{weather_data[0].location_id}_{month_key}",
-            'location_id': weather_data[0].location_id,
-            'month': month_key,
-            'temperature_avg': np.mean(temps_avg) if temps_avg else None,
-            'temperature_min': np.min(temps_min) if temps_min else None,
-            'temperature_max': np.max(temps_max) if temps_max else None,
-            'precipitation_total': np.sum(precip) if precip else None,
-            'growing_degree_days': np.sum(gdd) if gdd else None,
-            'stress_days': len([w for w in weather_data if w.stress_index and w.stress_index > 0.5])
-        }
+    def _create_weather_nodes(self, tx, weather_rows: List[Dict[str, Any]]) -> None:
+        """Create aggregated weather nodes (monthly summaries), WEATHER_BATCH_SIZE rows per UNWIND"""
         
         query = """
-        MERGE (w:Weather {weather_id: $weather_id})
-        SET w += $weather_data
-        WITH w
-        MATCH (l:Location {location_id: $location_id})
+        UNWIND $rows AS row
+        MERGE (w:Weather {weather_id: row.weather_id})
+        SET w += row
+        WITH w, row
+        MATCH (l:Location {location_id: row.location_id})
         MERGE (l)-[:HAS_WEATHER]->(w)
-        RETURN w
         """
         
-        with self.driver.session() as session:
-            session.run(query, weather_data=weather_summary, location_id=weather_data[0].location_id)
+        for batch_start in range(0, len(weather_rows), WEATHER_BATCH_SIZE):
+            tx.run(query, rows=weather_rows[batch_start:batch_start + WEATHER_BATCH_SIZE])
     
-    def _create_soil_node(self, soil_data: SoilData) -> None:
+    def _create_soil_node(self, tx, soil_data: SoilData) -> None:
         """Create soil data node"""
+        self._create_soil_nodes(tx, [soil_data.__dict__.copy()])
+    
+    def _create_soil_nodes(self, tx, soil_rows: List[Dict[str, Any]]) -> None:
+        """
+        Create soil data nodes in a single UNWIND; accepts SoilData dicts or
+        get_soil_data_bulk(...).to_dict('records')
+        """
         query = """
-        MERGE (s:Soil {soil_id: $soil_id})
-        SET s += $soil_data
-        WITH s
-        MATCH (l:Location {location_id: $location_id})
+        UNWIND $rows AS row
+        MERGE (s:Soil {soil_id: row.soil_id})
+        SET s += row
+        WITH s, row
+        MATCH (l:Location {location_id: row.location_id})
         MERGE (l)-[:HAS_SOIL]->(s)
-        RETURN s
         """
         
-        soil_dict = soil_data.__dict__.copy()
-        soil_dict['soil_id'] = f"soil_{soil_data.location_id}"
-        
-        with self.driver.session() as session:
-            session.run(query, soil_data=soil_dict, location_id=soil_data.location_id)
-    
-    def _create_envo_relationships(self, profile: EnvironmentalProfile) -> None:
-        """Create ENVO ontology term relationships"""
-        for envo_term in profile.envo_terms:
-            if envo_term:
-                # Create ENVO term node
-                term_details = self.envo_client.get_term_details(envo_term)
-                
-                term_data = {
-                    'term_id': envo_term,
-                    'name': term_details.get('label', '') if term_details else '',
-                    'description': term_details.get('description', [''])[0] if term_details else '',
-                    'ontology': 'ENVO'
-                }
-                
-                query = """
-                MERGE (ont:OntologyTerm {term_id: $term_id})
-                SET ont += $term_data
-                WITH ont
-                MATCH (e:Environment {environment_id: $environment_id})
-                MERGE (e)-[:ANNOTATED_WITH]->(ont)
-                RETURN ont
-                """
-                
-                with self.driver.session() as session:
-                    session.run(query, 
-                               term_data=term_data, 
-                               term_id=envo_term,
-                               environment_id=f"env_{profile.location.location_id}")
+        rows = [{**row, 'soil_id': f"soil_{row['location_id']}"} for row in soil_rows]
+        tx.run(query, rows=rows)
+    
+    def _envo_term_rows(self, profile: EnvironmentalProfile) -> List[Dict[str, Any]]:
+        """Look up ENVO term details concurrently and build one node row per term"""
+        envo_terms = [envo_term for envo_term in profile.envo_terms if envo_term]
+        details = self.envo_client.map_concurrent(self.envo_client.get_term_details, envo_terms)
+        
+        rows = []
+        for envo_term, term_details in zip(envo_terms, details):
+            rows.append({
+                'term_id': envo_term,
+                'name': term_details.get('label', '') if term_details else '',
+                'description': term_details.get('description', [''])[0] if term_details else '',
+                'ontology': 'ENVO'
+            })
+        return rows
+    
+    def _create_envo_relationships(self, tx, profile: EnvironmentalProfile,
+                                   envo_rows: List[Dict[str, Any]]) -> None:
+        """Create ENVO ontology term relationships in a single UNWIND"""
+        if not envo_rows:
+            return
+        
+        query = """
+        MATCH (e:Environment {environment_id: $environment_id})
+        UNWIND $rows AS row
+        MERGE (ont:OntologyTerm {term_id: row.term_id})
+        SET ont += row
+        MERGE (e)-[:ANNOTATED_WITH]->(ont)
+        """
+        
+        tx.run(query, rows=envo_rows, environment_id=f"env_{profile.location.location_id}")
 
 def main():
     """Example usage of environmental integration system"""
@@ -7,31 +7,91 @@ with more genes, genotypes, traits, QTLs, trials, and molecular data.
 """
 
 import pandas as pd
+import numpy as np
 import os
+import re
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
 from dotenv import load_dotenv
 from neo4j import GraphDatabase
 import warnings
 warnings.filterwarnings("ignore")
 
+try:
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Relationship rows per UNWIND transaction, to keep transaction size bounded
+RELATIONSHIP_BATCH_SIZE = 10000
+# Rows read per CSV/Parquet chunk, to keep memory bounded
+CSV_CHUNKSIZE = 50000
+RELATIONSHIP_COLUMNS = ['subject', 'predicate', 'object']
+
+# Entity name patterns used to infer node labels
+GENE_PATTERNS = ['DREB', 'Zm', 'PSY', 'VPP', 'NF-Y', 'CCT', 'EREB', 'WRKY', 'MYB', 'HDZ', 'TCP', 'NAC', 'ARF', 'GRF', 'SPL', 'KN', 'GA20ox']
+TRAIT_PATTERNS = ['tolerance', 'yield', 'depth', 'color', 'roots', 'flowering', 'resistance', 'production', 'architecture', 'height', 'senescence', 'development', 'size', 'elongation', 'efficiency', 'protein', 'kernel', 'leaves', 'system', 'lodging', 'rainfall', 'stress']
+WEATHER_PATTERNS = ['drought', 'normal', 'high', 'cold', 'wind', 'rainfall', 'temperature']
+PATHWAY_PATTERNS = ['pathway', 'signaling', 'biosynthesis', 'metabolism', 'response', 'clock', 'division']
+GENOTYPE_NAMES = frozenset(['B73', 'Mo17', 'CML247', 'W22', 'Oh43', 'PH207', 'Ki3', 'A632', 'Tx303', 'NC350', 'F7', 'B37'])
+LOCATION_NAMES = frozenset(['Ames', 'Iowa', 'Nebraska', 'Illinois', 'Kansas', 'Minnesota'])
+
+# Precompiled alternations: one regex scan per entity instead of one per pattern
+GENE_RE = re.compile('|'.join(map(re.escape, GENE_PATTERNS)))
+TRAIT_RE = re.compile('|'.join(map(re.escape, TRAIT_PATTERNS)), re.IGNORECASE)
+WEATHER_RE = re.compile('|'.join(map(re.escape, WEATHER_PATTERNS)), re.IGNORECASE)
+PATHWAY_RE = re.compile('|'.join(map(re.escape, PATHWAY_PATTERNS)), re.IGNORECASE)
+
 class Neo4jConnection:
     """Neo4j database connection wrapper"""
     
-    def __init__(self, uri, username=None, password=None, database="neo4j"):
+    def __init__(self, uri, username=None, password=None, database="neo4j",
+                 max_connection_pool_size=50, connection_acquisition_timeout=60.0):
+        pool_config = {
+            'max_connection_pool_size': max_connection_pool_size,
+            'connection_acquisition_timeout': connection_acquisition_timeout,
+        }
         if username and password:
-            self.driver = GraphDatabase.driver(uri, auth=(username, password))
+            self.driver = GraphDatabase.driver(uri, auth=(username, password), **pool_config)
         else:
-            self.driver = GraphDatabase.driver(uri)
+            self.driver = GraphDatabase.driver(uri, **pool_config)
         self.database = database
     
     def close(self):
         if self.driver:
             self.driver.close()
     
-    def query(self, cypher, params=None):
+    @contextmanager
+    def session(self, session=None):
+        """Yield the caller's session, or open (and close) a fresh one"""
+        if session is not None:
+            yield session
+        else:
+            with self.driver.session(database=self.database) as new_session:
+                yield new_session
+    
+    def query(self, cypher, params=None, session=None):
         """Execute a Cypher query and return results"""
-        with self.driver.session(database=self.database) as session:
+        with self.session(session) as session:
             result = session.run(cypher, params or {})
             return [record.data() for record in result]
+    
+    def write_many(self, statements, session=None):
+        """Execute several (cypher, params) statements in one write transaction"""
+        def _run_all(tx):
+            return [[record.data() for record in tx.run(cypher, params or {})]
+                    for cypher, params in statements]
+        
+        with self.session(session) as session:
+            return session.execute_write(_run_all)
 
 def setup_neo4j_connection():
     """Setup Neo4j connection using environment variables"""
@@ -61,22 +121,35 @@ def setup_neo4j_connection():
         print(f"Connection failed: {e}")
         raise
     
+    # MERGE on name needs an index-backed lookup before any bulk load
+    ensure_name_constraints(kg)
+    
     return kg
 
+def ensure_name_constraints(kg):
+    """Create a uniqueness constraint (and its backing index) on name for every node label"""
+    for label in NODE_LABELS:
+        try:
+            kg.query(f"CREATE CONSTRAINT {label.lower()}_name_unique IF NOT EXISTS "
+                     f"FOR (n:{label}) REQUIRE n.name IS UNIQUE")
+        except Exception as e:
+            print(f"Note: name constraint for {label} not created: {e}")
+
+@lru_cache(maxsize=None)
 def determine_node_type(entity_name):
     """Determine the appropriate node label based on entity name patterns"""
     entity_lower = entity_name.lower()
     
     # Gene patterns (expanded)
-    if any(pattern in entity_name for pattern in ['DREB', 'Zm', 'PSY', 'VPP', 'NF-Y', 'CCT', 'EREB', 'WRKY', 'MYB', 'HDZ', 'TCP', 'NAC', 'ARF', 'GRF', 'SPL', 'KN', 'GA20ox']):
+    if GENE_RE.search(entity_name):
         return 'Gene'
     
     # Trait patterns (expanded)
-    elif any(trait in entity_lower for trait in ['tolerance', 'yield', 'depth', 'color', 'roots', 'flowering', 'resistance', 'production', 'architecture', 'height', 'senescence', 'development', 'size', 'elongation', 'efficiency', 'protein', 'kernel', 'leaves', 'system', 'lodging', 'rainfall', 'stress']):
+    elif TRAIT_RE.search(entity_name):
         return 'Trait'
     
     # Genotype patterns (expanded)
-    elif entity_name in ['B73', 'Mo17', 'CML247', 'W22', 'Oh43', 'PH207', 'Ki3', 'A632', 'Tx303', 'NC350', 'F7', 'B37']:
+    elif entity_name in GENOTYPE_NAMES:
         return 'Genotype'
     
     # QTL patterns
@@ -92,108 +165,245 @@ def determine_node_type(entity_name):
         return 'Trial'
     
     # Location patterns (expanded)
-    elif entity_name in ['Ames', 'Iowa', 'Nebraska', 'Illinois', 'Kansas', 'Minnesota']:
+    elif entity_name in LOCATION_NAMES:
         return 'Location'
     
     # Weather patterns (expanded)
-    elif any(weather in entity_lower for weather in ['drought', 'normal', 'high', 'cold', 'wind', 'rainfall', 'temperature']):
+    elif WEATHER_RE.search(entity_name):
         return 'Weather'
     
     # Molecular marker patterns
-    elif entity_name.startswith('SNP_') or entity_name.startswith('SSR_'):
+    elif entity_name.startswith(('SNP_', 'SSR_')):
         return 'Marker'
     
     # Pathway patterns
-    elif 'pathway' in entity_lower or 'signaling' in entity_lower or 'biosynthesis' in entity_lower or 'metabolism' in entity_lower or 'response' in entity_lower or 'clock' in entity_lower or 'division' in entity_lower:
+    elif PATHWAY_RE.search(entity_name):
         return 'Pathway'
     
     # Default to Entity if no pattern matches
     else:
         return 'Entity'
 
-def create_node(kg, entity_name, node_type):
-    """Create a node with appropriate label and properties"""
-    cypher = f"""
-    MERGE (n:{node_type} {{name: $name}})
-    RETURN n
-    """
-    kg.query(cypher, params={'name': entity_name})
+# Byte-level rule table mirroring determine_node_type, for the numba batch classifier.
+# Rules are checked in order and the first match wins; each rule is (kind, label, pattern).
+NODE_LABELS = ['Gene', 'Trait', 'Genotype', 'QTL', 'Chromosome', 'Trial', 'Location', 'Weather', 'Marker', 'Pathway', 'Entity']
+RULE_SUBSTRING, RULE_SUBSTRING_NOCASE, RULE_EXACT, RULE_PREFIX, RULE_QTL = range(5)
+CLASSIFY_RULES = (
+    [(RULE_SUBSTRING, 'Gene', p) for p in GENE_PATTERNS]
+    + [(RULE_SUBSTRING_NOCASE, 'Trait', p.lower()) for p in TRAIT_PATTERNS]
+    + [(RULE_EXACT, 'Genotype', name) for name in sorted(GENOTYPE_NAMES)]
+    + [(RULE_QTL, 'QTL', ''),
+       (RULE_SUBSTRING_NOCASE, 'Chromosome', 'chromosome'),
+       (RULE_SUBSTRING_NOCASE, 'Trial', 'trial')]
+    + [(RULE_EXACT, 'Location', name) for name in sorted(LOCATION_NAMES)]
+    + [(RULE_SUBSTRING_NOCASE, 'Weather', p.lower()) for p in WEATHER_PATTERNS]
+    + [(RULE_PREFIX, 'Marker', 'SNP_'), (RULE_PREFIX, 'Marker', 'SSR_')]
+    + [(RULE_SUBSTRING_NOCASE, 'Pathway', p.lower()) for p in PATHWAY_PATTERNS]
+)
+# Below this many entities the cached regex classifier is cheaper than encoding a batch
+NUMBA_MIN_BATCH = 10000
 
-def create_relationship(kg, subject, predicate, object_entity, subject_type, object_type):
-    """Create a relationship between two nodes"""
-    # Convert predicate to uppercase and replace spaces with underscores
-    relationship_type = predicate.upper().replace(' ', '_')
-    
-    cypher = f"""
-    MATCH (s:{subject_type} {{name: $subject}})
-    MATCH (o:{object_type} {{name: $object}})
-    MERGE (s)-[r:{relationship_type}]->(o)
-    RETURN s, r, o
-    """
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def _classify_kernel(buf, lengths, kinds, labels, patterns, pattern_lengths, default):
+        out = np.full(buf.shape[0], default, dtype=np.int8)
+        for i in range(buf.shape[0]):
+            n = lengths[i]
+            for r in range(kinds.shape[0]):
+                kind = kinds[r]
+                m = pattern_lengths[r]
+                hit = False
+                if kind == RULE_QTL:
+                    # Starts with 'q' and contains a digit
+                    if n > 0 and buf[i, 0] == 113:
+                        for j in range(n):
+                            if 48 <= buf[i, j] <= 57:
+                                hit = True
+                                break
+                elif kind == RULE_EXACT or kind == RULE_PREFIX:
+                    if n == m or (kind == RULE_PREFIX and n > m):
+                        hit = True
+                        for k in range(m):
+                            if buf[i, k] != patterns[r, k]:
+                                hit = False
+                                break
+                else:
+                    for j in range(n - m + 1):
+                        hit = True
+                        for k in range(m):
+                            c = buf[i, j + k]
+                            if kind == RULE_SUBSTRING_NOCASE and 65 <= c <= 90:
+                                c += 32  # ASCII lower-case
+                            if c != patterns[r, k]:
+                                hit = False
+                                break
+                        if hit:
+                            break
+                if hit:
+                    out[i] = labels[r]
+                    break
+        return out
     
-    result = kg.query(cypher, params={
-        'subject': subject, 
-        'object': object_entity
-    })
-    
-    if not result:
-        print(f"Warning: Could not create relationship {subject} -{relationship_type}-> {object_entity}")
+    _RULE_KINDS = np.array([kind for kind, _, _ in CLASSIFY_RULES], dtype=np.int8)
+    _RULE_LABELS = np.array([NODE_LABELS.index(label) for _, label, _ in CLASSIFY_RULES], dtype=np.int8)
+    _RULE_LENGTHS = np.array([len(pattern) for _, _, pattern in CLASSIFY_RULES], dtype=np.int64)
+    _RULE_PATTERNS = np.zeros((len(CLASSIFY_RULES), _RULE_LENGTHS.max()), dtype=np.uint8)
+    for _r, (_, _, _pattern) in enumerate(CLASSIFY_RULES):
+        _RULE_PATTERNS[_r, :len(_pattern)] = np.frombuffer(_pattern.encode('ascii'), dtype=np.uint8)
 
-def load_csv_data(kg, csv_file):
-    """Load a single CSV file and add to knowledge graph"""
-    print(f"Loading data from {csv_file}...")
+def classify_entities(entities):
+    """Batch determine_node_type; returns {entity: label}"""
+    entities = list(entities)
+    ascii_names = [entity for entity in entities if entity.isascii()] if NUMBA_AVAILABLE else []
+    if len(ascii_names) < NUMBA_MIN_BATCH:
+        return {entity: determine_node_type(entity) for entity in entities}
     
-    # Read the CSV file
-    df = pd.read_csv(csv_file)
-    print(f"  Found {len(df)} relationships")
+    # Fixed-width byte buffer, one row per name
+    encoded = np.array(ascii_names, dtype=bytes)
+    buf = encoded.view(np.uint8).reshape(len(ascii_names), -1)
+    lengths = np.char.str_len(encoded).astype(np.int64)
+    codes = _classify_kernel(buf, lengths, _RULE_KINDS, _RULE_LABELS, _RULE_PATTERNS,
+                             _RULE_LENGTHS, NODE_LABELS.index('Entity'))
+    entity_types = dict(zip(ascii_names, np.array(NODE_LABELS)[codes].tolist()))
     
+    # Non-ASCII names take the regex path
+    for entity in entities:
+        if entity not in entity_types:
+            entity_types[entity] = determine_node_type(entity)
+    return entity_types
+
+def node_batch_statements(nodes_by_label):
+    """Build one UNWIND MERGE statement per node label"""
+    statements = []
+    for node_type, rows in nodes_by_label.items():
+        cypher = f"""
+        UNWIND $rows AS r
+        MERGE (n:{node_type} {{name: r.name}})
+        """
+        statements.append((cypher, {'rows': rows}))
+    return statements
+
+def relationship_batch_statements(rels_by_group, batch_size=RELATIONSHIP_BATCH_SIZE):
+    """Build UNWIND MERGE statements per (subject_type, object_type, type) group, batch_size rows each"""
+    statements = []
+    for (subject_type, object_type, relationship_type), rows in rels_by_group.items():
+        cypher = f"""
+        UNWIND $rows AS r
+        MATCH (s:{subject_type} {{name: r.s}})
+        MATCH (o:{object_type} {{name: r.o}})
+        MERGE (s)-[rel:{relationship_type}]->(o)
+        RETURN count(rel) AS created
+        """
+        for start in range(0, len(rows), batch_size):
+            key = (subject_type, object_type, relationship_type)
+            statements.append((key, cypher, {'rows': rows[start:start + batch_size]}))
+    return statements
+
+def iter_relationship_chunks(path, chunksize=CSV_CHUNKSIZE):
+    """
+    Yield subject/predicate/object DataFrames of at most chunksize rows from a CSV or Parquet file.
+    The few distinct predicates are stored as a categorical, so grouping works on integer codes.
+    """
+    if path.endswith('.parquet'):
+        if PYARROW_AVAILABLE:
+            parquet_file = pq.ParquetFile(path)
+            for batch in parquet_file.iter_batches(batch_size=chunksize, columns=RELATIONSHIP_COLUMNS):
+                yield batch.to_pandas().astype({'predicate': 'category'})
+        else:
+            yield pd.read_parquet(path, columns=RELATIONSHIP_COLUMNS).astype({'predicate': 'category'})
+    else:
+        yield from pd.read_csv(path, usecols=RELATIONSHIP_COLUMNS, dtype={'predicate': 'category'},
+                               chunksize=chunksize)
+
+def load_chunk(kg, df, entity_types, session):
+    """Merge the new entities and the relationships of one chunk; returns (wrote_nodes, relationships)"""
     # Collect all entities and their types
-    entities = set()
-    entity_types = {}
+    entities = pd.unique(df[['subject', 'object']].to_numpy().ravel())
     
-    for _, row in df.iterrows():
-        subject = row['subject']
-        object_entity = row['object']
-        
-        entities.add(subject)
-        entities.add(object_entity)
+    # Determine node types for entities not merged yet and group them by label
+    new_types = classify_entities(entity for entity in entities if entity not in entity_types)
+    entity_types.update(new_types)
+    nodes_by_label = defaultdict(list)
+    for entity, node_type in new_types.items():
+        nodes_by_label[node_type].append({'name': entity})
     
-    # Determine node types for all entities
-    new_nodes = 0
-    for entity in entities:
-        node_type = determine_node_type(entity)
-        entity_types[entity] = node_type
-        
-        # Check if node already exists
-        existing = kg.query(f"MATCH (n:{node_type} {{name: $name}}) RETURN n", params={'name': entity})
-        if not existing:
-            create_node(kg, entity, node_type)
-            new_nodes += 1
+    # Group relationships by (subject_type, object_type, relationship type)
+    typed = df.assign(subject_type=df['subject'].map(entity_types), object_type=df['object'].map(entity_types))
+    rels_by_group = defaultdict(list)
+    groups = typed.groupby(['subject_type', 'predicate', 'object_type'], sort=False, observed=True)
+    for (subject_type, predicate, object_type), group in groups:
+        # Convert predicate to uppercase and replace spaces with underscores
+        relationship_type = predicate.upper().replace(' ', '_')
+        rels_by_group[(subject_type, object_type, relationship_type)].extend(
+            {'s': subject, 'o': object_entity}
+            for subject, object_entity in zip(group['subject'].tolist(), group['object'].tolist())
+        )
     
-    print(f"  Created {new_nodes} new nodes")
+    # Nodes first so the relationship MATCHes find them
+    if nodes_by_label:
+        kg.write_many(node_batch_statements(nodes_by_label), session)
     
-    # Create relationships
+    # One write transaction per batch
+    relationships = 0
+    for (subject_type, object_type, relationship_type), cypher, params in relationship_batch_statements(rels_by_group):
+        result = kg.write_many([(cypher, params)], session)[0]
+        created = result[0]['created'] if result else 0
+        if created < len(params['rows']):
+            print(f"Warning: Could only create {created}/{len(params['rows'])} "
+                  f"{subject_type} -{relationship_type}-> {object_type} relationships")
+        relationships += len(params['rows'])
+    
+    return bool(nodes_by_label), relationships
+
+def load_csv_data(kg, csv_file, entity_types=None, chunksize=CSV_CHUNKSIZE):
+    """
+    Load a single CSV file and add to knowledge graph.
+    The file is streamed in chunks of chunksize rows, so memory stays bounded.
+    entity_types maps entities already merged in this run to their labels; pass the
+    same dict for every file so entities shared between files are merged only once.
+    """
+    print(f"Loading data from {csv_file}...")
+    if entity_types is None:
+        entity_types = {}
+    
+    # One session for every statement of this file
+    total_rows = 0
     new_relationships = 0
-    for _, row in df.iterrows():
-        subject = row['subject']
-        predicate = row['predicate']
-        object_entity = row['object']
+    nodes_written = False
+    with kg.session() as session:
+        # MERGE is idempotent, so no per-entity existence check; new nodes come from the count delta
+        nodes_before, _ = get_graph_stats(kg, session)
         
-        subject_type = entity_types[subject]
-        object_type = entity_types[object_entity]
+        for df in iter_relationship_chunks(csv_file, chunksize):
+            wrote_nodes, relationships = load_chunk(kg, df, entity_types, session)
+            nodes_written = nodes_written or wrote_nodes
+            total_rows += len(df)
+            new_relationships += relationships
         
-        create_relationship(kg, subject, predicate, object_entity, subject_type, object_type)
-        new_relationships += 1
+        new_nodes = 0
+        if nodes_written:
+            nodes_after, _ = get_graph_stats(kg, session)
+            new_nodes = nodes_after - nodes_before
     
+    print(f"  Found {total_rows} relationships")
+    print(f"  Created {new_nodes} new nodes")
     print(f"  Created {new_relationships} relationships")
     return new_nodes, new_relationships
 
-def get_graph_stats(kg):
+def get_graph_stats(kg, session=None):
     """Get current graph statistics"""
-    node_count = kg.query("MATCH (n) RETURN count(n) as count")[0]['count']
-    rel_count = kg.query("MATCH ()-[r]->() RETURN count(r) as count")[0]['count']
+    node_count = kg.query("MATCH (n) RETURN count(n) as count", session=session)[0]['count']
+    rel_count = kg.query("MATCH ()-[r]->() RETURN count(r) as count", session=session)[0]['count']
     return node_count, rel_count
 
+def label_counts_query(labels):
+    """Single-round-trip query returning one column per label with its node count"""
+    # One label-scoped count per subquery keeps each count served from the count store
+    subqueries = "\n".join(
+        f"CALL {{ MATCH (n:{label}) RETURN count(n) AS {label} }}" for label in labels
+    )
+    return f"{subqueries}\nRETURN {', '.join(labels)}"
+
 def main():
     """Main function to expand the knowledge graph"""
     print("=== Expanding Maize Knowledge Graph ===")
@@ -222,11 +432,17 @@ def main():
         
         total_new_nodes = 0
         total_new_rels = 0
+        # Entities merged so far in this run, shared across files
+        entity_types = {}
         
         # Load each CSV file
         for csv_file in csv_files:
+            # Prefer a Parquet export of the same data when one exists
+            parquet_file = os.path.splitext(csv_file)[0] + '.parquet'
+            if os.path.exists(parquet_file):
+                csv_file = parquet_file
             if os.path.exists(csv_file):
-                new_nodes, new_rels = load_csv_data(kg, csv_file)
+                new_nodes, new_rels = load_csv_data(kg, csv_file, entity_types)
                 total_new_nodes += new_nodes
                 total_new_rels += new_rels
             else:
@@ -246,9 +462,10 @@ def main():
         # Count nodes by type
         print("\nNode counts by type:")
         node_types = ['Gene', 'Trait', 'Genotype', 'QTL', 'Chromosome', 'Trial', 'Location', 'Weather', 'Marker', 'Pathway']
+        result = kg.query(label_counts_query(node_types))
+        counts = result[0] if result else {}
         for node_type in node_types:
-            result = kg.query(f"MATCH (n:{node_type}) RETURN count(n) as count")
-            count = result[0]['count'] if result else 0
+            count = counts.get(node_type, 0)
             if count > 0:
                 print(f"  {node_type}: {count}")
         
@@ -9,7 +9,7 @@ genotype × environment interactions, and candidate gene identification.
 import torch
 import torch.nn as nn
 import torch.nn.functional as F
-from torch_geometric.nn import GCNConv, SAGEConv, GATConv, global_mean_pool
+from torch_geometric.nn import SAGEConv, GATConv, global_mean_pool
 from torch_geometric.data import Data, DataLoader
 from torch_geometric.utils import negative_sampling, train_test_split_edges
 import numpy as np
@@ -22,6 +22,16 @@ from sklearn.model_selection import train_test_split
 from neo4j import GraphDatabase
 import pickle
 import os
+from contextlib import ExitStack
+
+# NeighborLoader needs a sampling backend (pyg-lib or torch-sparse)
+try:
+    from torch_geometric.loader import NeighborLoader
+    from torch_geometric.sampler import NeighborSampler
+    from torch_geometric.typing import WITH_PYG_LIB, WITH_TORCH_SPARSE
+    NEIGHBOR_SAMPLING_AVAILABLE = WITH_PYG_LIB or WITH_TORCH_SPARSE
+except ImportError:
+    NEIGHBOR_SAMPLING_AVAILABLE = False
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -38,6 +48,25 @@ class GNNConfig:
     num_epochs: int = 100
     early_stopping_patience: int = 10
     device: str = "cuda" if torch.cuda.is_available() else "cpu"
+    # Run inference under bfloat16 autocast on CUDA (training stays in fp32)
+    inference_autocast: bool = True
+    # Negative edges drawn once per training run, as a multiple of the positive edges
+    negative_pool_factor: int = 10
+    # Extracted graph cache, reused while the Neo4j node/relationship counts are unchanged (None disables)
+    graph_cache_path: Optional[str] = "models/graph_cache.pt"
+    # Neighbours sampled per layer when embedding query nodes for inference, one entry
+    # per layer; None samples 15 at the first hop and 10 at each deeper one
+    num_neighbors: Optional[List[int]] = None
+    inference_batch_size: int = 256
+    # Compile the trained gene-trait model with torch.compile for CUDA inference
+    compile_inference: bool = True
+    
+    def __post_init__(self):
+        if self.num_neighbors is None:
+            self.num_neighbors = [15] + [10] * (self.num_layers - 1)
+        elif len(self.num_neighbors) != self.num_layers:
+            raise ValueError(f"num_neighbors has {len(self.num_neighbors)} entries, "
+                             f"expected one per layer ({self.num_layers})")
 
 @dataclass
 class PredictionResult:
@@ -51,11 +80,41 @@ class PredictionResult:
 class GraphDataExtractor:
     """Extracts graph data from Neo4j for GNN training"""
     
-    def __init__(self, neo4j_driver: GraphDatabase.driver):
+    def __init__(self, neo4j_driver: GraphDatabase.driver, cache_path: Optional[str] = None):
         self.driver = neo4j_driver
+        self.cache_path = cache_path
+    
+    def graph_fingerprint(self) -> Tuple[int, int]:
+        """Total node and relationship counts (served from the Neo4j count store)"""
+        with self.driver.session() as session:
+            node_count = session.run("MATCH (n) RETURN count(n) AS count").single()['count']
+            rel_count = session.run("MATCH ()-[r]->() RETURN count(r) AS count").single()['count']
+        return node_count, rel_count
+    
+    def extract_gene_trait_graph(self, refresh: bool = False) -> Tuple[Data, Dict[str, int], Dict[int, str]]:
+        """
+        Extract gene-trait interaction graph.
+        With a cache_path, the result is reused until the graph's node or relationship
+        count changes; property-only edits are not detected, so pass refresh=True after them.
+        """
+        if not self.cache_path:
+            return self._extract_gene_trait_graph()
+        
+        fingerprint = self.graph_fingerprint()
+        if not refresh and os.path.exists(self.cache_path):
+            # Our own cache file, which holds a PyG Data object, not only tensors
+            cached = torch.load(self.cache_path, weights_only=False)
+            if cached.get('fingerprint') == fingerprint:
+                logger.info(f"Loaded gene-trait graph from {self.cache_path}")
+                return cached['data'], cached['node_to_idx'], cached['idx_to_node']
+        
+        data, node_to_idx, idx_to_node = self._extract_gene_trait_graph()
+        os.makedirs(os.path.dirname(self.cache_path) or '.', exist_ok=True)
+        torch.save({'fingerprint': fingerprint, 'data': data,
+                    'node_to_idx': node_to_idx, 'idx_to_node': idx_to_node}, self.cache_path)
+        return data, node_to_idx, idx_to_node
     
-    def extract_gene_trait_graph(self) -> Tuple[Data, Dict[str, int], Dict[int, str]]:
-        """Extract gene-trait interaction graph"""
+    def _extract_gene_trait_graph(self) -> Tuple[Data, Dict[str, int], Dict[int, str]]:
         logger.info("Extracting gene-trait graph from Neo4j")
         
         # Get all genes and traits
@@ -83,18 +142,17 @@ class GraphDataExtractor:
             edge_results = session.run(edges_query)
             edges_df = pd.DataFrame([record.data() for record in edge_results])
         
-        # Create node mappings
-        node_to_idx = {row['node_id']: idx for idx, row in nodes_df.iterrows()}
-        idx_to_node = {idx: row['identifier'] for idx, row in nodes_df.iterrows()}
+        # Create node mappings (row position = node index)
+        node_to_idx = dict(zip(nodes_df['node_id'].tolist(), range(len(nodes_df))))
+        idx_to_node = dict(enumerate(nodes_df['identifier'].tolist()))
         
         # Create node features (one-hot encoding for node types + additional features)
         node_features = self._create_node_features(nodes_df)
         
-        # Create edge index
-        edge_index = torch.tensor([
-            [node_to_idx[row['source']] for _, row in edges_df.iterrows()],
-            [node_to_idx[row['target']] for _, row in edges_df.iterrows()]
-        ], dtype=torch.long)
+        # Create edge index, mapping Neo4j ids to node indices column-wise
+        src = edges_df['source'].map(node_to_idx).to_numpy(dtype=np.int64)
+        dst = edges_df['target'].map(node_to_idx).to_numpy(dtype=np.int64)
+        edge_index = torch.from_numpy(np.stack([src, dst]))
         
         # Create edge weights
         edge_weights = torch.tensor(edges_df['weight'].values, dtype=torch.float)
@@ -110,42 +168,39 @@ class GraphDataExtractor:
         return data, node_to_idx, idx_to_node
     
     def _create_node_features(self, nodes_df: pd.DataFrame) -> torch.Tensor:
-        """Create node feature matrix"""
-        features = []
-        
-        for _, row in nodes_df.iterrows():
-            node_props = row['node_properties']
-            node_type = row['node_type']
-            
-            # One-hot encoding for node type
-            type_features = [1.0 if node_type == 'Gene' else 0.0,
-                           1.0 if node_type == 'Trait' else 0.0]
-            
-            # Additional features based on node properties
-            additional_features = []
-            
-            if node_type == 'Gene':
-                # Gene-specific features
-                additional_features.extend([
-                    float(node_props.get('chromosome', 0)) / 10.0,  # Normalized chromosome
-                    float(node_props.get('start_pos', 0)) / 1e8,    # Normalized position
-                    1.0 if 'transcription' in str(node_props.get('description', '')).lower() else 0.0
-                ])
-            elif node_type == 'Trait':
-                # Trait-specific features
-                additional_features.extend([
-                    1.0 if 'yield' in str(node_props.get('name', '')).lower() else 0.0,
-                    1.0 if 'stress' in str(node_props.get('name', '')).lower() else 0.0,
-                    float(node_props.get('heritability', 0.5))
-                ])
-            
-            # Pad to consistent length
-            while len(additional_features) < 3:
-                additional_features.append(0.0)
-            
-            features.append(type_features + additional_features[:3])
-        
-        return torch.tensor(features, dtype=torch.float)
+        """Create node feature matrix (column-wise over all nodes)"""
+        props = pd.DataFrame.from_records(
+            [dict(node_props) for node_props in nodes_df['node_properties']], index=nodes_df.index
+        ).reindex(columns=['chromosome', 'start_pos', 'description', 'name', 'heritability'])
+        
+        def numeric(column: str, default: float) -> np.ndarray:
+            return pd.to_numeric(props[column], errors='coerce').fillna(default).to_numpy(np.float32)
+        
+        def mentions(column: str, word: str) -> np.ndarray:
+            return props[column].astype(str).str.contains(word, case=False, regex=False).to_numpy(np.float32)
+        
+        # One-hot encoding for node type
+        is_gene = (nodes_df['node_type'] == 'Gene').to_numpy(np.float32)
+        is_trait = (nodes_df['node_type'] == 'Trait').to_numpy(np.float32)
+        
+        # Gene-specific features: normalized chromosome, normalized position, transcription factor
+        gene_features = np.column_stack([
+            numeric('chromosome', 0) / 10.0,
+            numeric('start_pos', 0) / 1e8,
+            mentions('description', 'transcription')
+        ])
+        # Trait-specific features: yield, stress, heritability
+        trait_features = np.column_stack([
+            mentions('name', 'yield'),
+            mentions('name', 'stress'),
+            numeric('heritability', 0.5)
+        ])
+        # Other node types get zero padding
+        additional_features = np.where(is_gene[:, None] > 0, gene_features,
+                                       np.where(is_trait[:, None] > 0, trait_features, 0.0))
+        
+        features = np.column_stack([is_gene, is_trait, additional_features]).astype(np.float32)
+        return torch.from_numpy(features)
 
 class GeneTrait_GNN(nn.Module):
     """GNN model for gene-trait association prediction"""
@@ -154,23 +209,22 @@ class GeneTrait_GNN(nn.Module):
         super(GeneTrait_GNN, self).__init__()
         self.config = config
         
-        # Graph convolution layers
+        # GraphSAGE layers: mean aggregation stays valid on sampled subgraphs
         self.convs = nn.ModuleList()
-        self.convs.append(GCNConv(input_dim, config.hidden_dim))
+        self.convs.append(SAGEConv(input_dim, config.hidden_dim))
         
         for _ in range(config.num_layers - 1):
-            self.convs.append(GCNConv(config.hidden_dim, config.hidden_dim))
+            self.convs.append(SAGEConv(config.hidden_dim, config.hidden_dim))
         
         # Dropout
         self.dropout = nn.Dropout(config.dropout)
         
-        # Link prediction head
+        # Link prediction head (outputs logits; the sigmoid is fused into the loss)
         self.link_predictor = nn.Sequential(
             nn.Linear(config.hidden_dim * 2, config.hidden_dim),
             nn.ReLU(),
             nn.Dropout(config.dropout),
-            nn.Linear(config.hidden_dim, 1),
-            nn.Sigmoid()
+            nn.Linear(config.hidden_dim, 1)
         )
     
     def forward(self, x: torch.Tensor, edge_index: torch.Tensor, 
@@ -185,18 +239,22 @@ class GeneTrait_GNN(nn.Module):
         
         # Link prediction
         if edge_pairs is not None:
-            # Get embeddings for edge pairs
-            source_embeddings = x[edge_pairs[0]]
-            target_embeddings = x[edge_pairs[1]]
-            
-            # Concatenate embeddings
-            edge_embeddings = torch.cat([source_embeddings, target_embeddings], dim=1)
-            
-            # Predict link probability
-            predictions = self.link_predictor(edge_embeddings)
-            return predictions.squeeze()
+            return self.predict_links(x, edge_pairs)
         
         return x
+    
+    def predict_links(self, embeddings: torch.Tensor, edge_pairs: torch.Tensor) -> torch.Tensor:
+        """Link logits for edge_pairs (2 x num_pairs) from precomputed node embeddings"""
+        # Get embeddings for edge pairs
+        source_embeddings = embeddings[edge_pairs[0]]
+        target_embeddings = embeddings[edge_pairs[1]]
+        
+        # Concatenate embeddings
+        edge_embeddings = torch.cat([source_embeddings, target_embeddings], dim=1)
+        
+        # Predict link logit
+        predictions = self.link_predictor(edge_embeddings)
+        return predictions.squeeze()
 
 class GxE_InteractionGNN(nn.Module):
     """GNN model for Genotype × Environment interaction prediction"""
@@ -308,14 +366,22 @@ class GNNTrainer:
         model = model.to(self.device)
         data = data.to(self.device)
         optimizer = torch.optim.Adam(model.parameters(), lr=self.config.learning_rate)
-        criterion = nn.BCELoss()
+        criterion = nn.BCEWithLogitsLoss()
         
         # Split edges for training/validation
         num_edges = positive_edges.size(1)
         train_size = int(0.8 * num_edges)
         
-        train_pos_edges = positive_edges[:, :train_size]
-        val_pos_edges = positive_edges[:, train_size:]
+        train_pos_edges = positive_edges[:, :train_size].to(self.device)
+        val_pos_edges = positive_edges[:, train_size:].to(self.device)
+        num_train_pos = train_pos_edges.size(1)
+        
+        # Sample a pool of negative edges once on the device; each epoch draws from it
+        neg_pool = negative_sampling(
+            edge_index=train_pos_edges,
+            num_nodes=data.num_nodes,
+            num_neg_samples=num_train_pos * self.config.negative_pool_factor
+        )
         
         best_val_auc = 0
         patience_counter = 0
@@ -323,23 +389,20 @@ class GNNTrainer:
         for epoch in range(self.config.num_epochs):
             model.train()
             
-            # Generate negative edges
-            train_neg_edges = negative_sampling(
-                edge_index=train_pos_edges,
-                num_nodes=data.num_nodes,
-                num_neg_samples=train_pos_edges.size(1)
-            )
+            # Draw this epoch's negative edges from the pool
+            neg_choice = torch.randperm(neg_pool.size(1), device=self.device)[:num_train_pos]
+            train_neg_edges = neg_pool[:, neg_choice]
             
             # Combine positive and negative edges
             train_edges = torch.cat([train_pos_edges, train_neg_edges], dim=1)
             train_labels = torch.cat([
-                torch.ones(train_pos_edges.size(1)),
-                torch.zeros(train_neg_edges.size(1))
-            ]).to(self.device)
+                torch.ones(num_train_pos, device=self.device),
+                torch.zeros(train_neg_edges.size(1), device=self.device)
+            ])
             
             # Forward pass
             optimizer.zero_grad()
-            predictions = model(data.x, data.edge_index, train_edges.t())
+            predictions = model(data.x, data.edge_index, train_edges)
             loss = criterion(predictions, train_labels)
             
             # Backward pass
@@ -384,7 +447,7 @@ class GNNTrainer:
             ])
             
             # Get predictions
-            predictions = model(data.x, data.edge_index, eval_edges.t())
+            predictions = model(data.x, data.edge_index, eval_edges)
             
             # Calculate AUC
             auc = roc_auc_score(eval_labels.cpu(), predictions.cpu())
@@ -397,17 +460,27 @@ class GNNInferenceEngine:
     def __init__(self, neo4j_driver: GraphDatabase.driver, config: GNNConfig):
         self.driver = neo4j_driver
         self.config = config
-        self.extractor = GraphDataExtractor(neo4j_driver)
+        self.extractor = GraphDataExtractor(neo4j_driver, cache_path=config.graph_cache_path)
         self.trainer = GNNTrainer(config)
+        self.device = torch.device(config.device)
         
         # Models
         self.gene_trait_model = None
         self.gxe_model = None
         self.candidate_gene_model = None
+        # Forward used for inference: the compiled gene-trait model, or the model itself
+        self._gene_trait_forward = None
+        # Inference neighbourhood lookups, built once per graph on the CPU: a NeighborSampler
+        # over a CPU copy of the graph, or else in-edge CSC arrays for exact k-hop expansion
+        self._sampling_data = None
+        self._neighbor_sampler = None
+        self._csc_ptr: Optional[torch.Tensor] = None
+        self._csc_src: Optional[torch.Tensor] = None
         
         # Graph data
         self.graph_data = None
         self.node_mappings = None
+        self.identifier_to_idx: Dict[str, int] = {}
     
     def initialize_models(self) -> None:
         """Initialize and train all GNN models"""
@@ -415,17 +488,44 @@ class GNNInferenceEngine:
         
         # Extract graph data
         self.graph_data, node_to_idx, idx_to_node = self.extractor.extract_gene_trait_graph()
+        # Move the graph to the device once; training and inference reuse it there
+        self.graph_data = self.graph_data.to(self.device)
         self.node_mappings = {'node_to_idx': node_to_idx, 'idx_to_node': idx_to_node}
+        # Reverse lookup; the first index wins if identifiers repeat
+        self.identifier_to_idx = {}
+        for idx, identifier in idx_to_node.items():
+            self.identifier_to_idx.setdefault(identifier, idx)
+        self._build_inference_index()
         
         input_dim = self.graph_data.x.size(1)
         
         # Initialize models
-        self.gene_trait_model = GeneTrait_GNN(input_dim, self.config)
-        self.gxe_model = GxE_InteractionGNN(input_dim, self.config)
-        self.candidate_gene_model = CandidateGeneGNN(input_dim, self.config)
+        self.gene_trait_model = GeneTrait_GNN(input_dim, self.config).to(self.device)
+        self.gxe_model = GxE_InteractionGNN(input_dim, self.config).to(self.device)
+        self.candidate_gene_model = CandidateGeneGNN(input_dim, self.config).to(self.device)
         
         # Train models
         self._train_all_models()
+        self._gene_trait_forward = self._compile_for_inference(self.gene_trait_model)
+    
+    def _compile_for_inference(self, model: nn.Module) -> nn.Module:
+        """torch.compile a trained model for inference on CUDA; eager elsewhere or on failure"""
+        model.eval()
+        if not (self.config.compile_inference and self.device.type == 'cuda' and hasattr(torch, 'compile')):
+            return model
+        try:
+            # Query subgraphs vary in size, so compile for dynamic shapes. CUDA graphs
+            # ('reduce-overhead') would be re-recorded for nearly every query's shape
+            compiled = torch.compile(model, mode='max-autotune-no-cudagraphs', dynamic=True)
+            # Compilation is lazy; run one forward on a small subgraph so Inductor/Triton
+            # failures surface here rather than on the first prediction
+            subset, edge_index = self._k_hop_neighbourhood(torch.zeros(1, dtype=torch.long))
+            with self._inference_context():
+                compiled(self.graph_data.x[subset.to(self.device)], edge_index.to(self.device))
+            return compiled
+        except Exception as e:
+            logger.warning(f"torch.compile unavailable, using eager inference: {e}")
+            return model
     
     def _train_all_models(self) -> None:
         """Train all GNN models"""
@@ -441,51 +541,132 @@ class GNNInferenceEngine:
         if self.gene_trait_model is None:
             raise ValueError("Gene-trait model not initialized")
         
-        predictions = []
+        # Identifiers present in the graph, in input order
+        genes = [(gene_id, idx) for gene_id in gene_ids
+                 if (idx := self._get_node_index(gene_id)) is not None]
+        traits = [(trait_id, idx) for trait_id in trait_ids
+                  if (idx := self._get_node_index(trait_id)) is not None]
+        if not genes or not traits:
+            return []
+        
         self.gene_trait_model.eval()
         
-        with torch.no_grad():
-            for gene_id in gene_ids:
-                for trait_id in trait_ids:
-                    # Get node indices
-                    gene_idx = self._get_node_index(gene_id)
-                    trait_idx = self._get_node_index(trait_id)
-                    
-                    if gene_idx is not None and trait_idx is not None:
-                        # Create edge pair
-                        edge_pair = torch.tensor([[gene_idx], [trait_idx]], dtype=torch.long)
-                        
-                        # Get prediction
-                        score = self.gene_trait_model(
-                            self.graph_data.x, 
-                            self.graph_data.edge_index, 
-                            edge_pair
-                        ).item()
-                        
-                        # Calculate confidence (simplified)
-                        confidence = min(1.0, score * 2) if score > 0.5 else score
-                        
-                        predictions.append(PredictionResult(
-                            source_id=gene_id,
-                            target_id=trait_id,
-                            prediction_score=score,
-                            confidence=confidence,
-                            prediction_type='gene_trait'
-                        ))
+        with self._inference_context():
+            # Embed only the query nodes, then score every gene × trait pair in one batch
+            gene_idx = torch.tensor([idx for _, idx in genes], dtype=torch.long, device=self.device)
+            trait_idx = torch.tensor([idx for _, idx in traits], dtype=torch.long, device=self.device)
+            query_idx = torch.unique(torch.cat([gene_idx, trait_idx]))
+            embeddings = self._query_embeddings(query_idx)
+            # Rows of embeddings follow the sorted query_idx
+            edge_pairs = torch.cartesian_prod(torch.searchsorted(query_idx, gene_idx),
+                                              torch.searchsorted(query_idx, trait_idx)).t()
+            scores = torch.sigmoid(self.gene_trait_model.predict_links(embeddings, edge_pairs))
+            scores = scores.float().reshape(len(genes), len(traits)).cpu().tolist()
+        
+        predictions = []
+        for (gene_id, _), gene_scores in zip(genes, scores):
+            for (trait_id, _), score in zip(traits, gene_scores):
+                # Calculate confidence (simplified)
+                confidence = min(1.0, score * 2) if score > 0.5 else score
+                
+                predictions.append(PredictionResult(
+                    source_id=gene_id,
+                    target_id=trait_id,
+                    prediction_score=score,
+                    confidence=confidence,
+                    prediction_type='gene_trait'
+                ))
         
         return sorted(predictions, key=lambda x: x.prediction_score, reverse=True)
     
+    def _build_inference_index(self) -> None:
+        """Prepare the per-graph structures _query_embeddings reuses across predictions"""
+        data = self.graph_data
+        if NEIGHBOR_SAMPLING_AVAILABLE:
+            # The sampler converts the graph to CSC once; batches are moved to the device
+            self._sampling_data = data.cpu()
+            self._neighbor_sampler = NeighborSampler(self._sampling_data,
+                                                     num_neighbors=self.config.num_neighbors)
+        else:
+            # Incoming edges grouped by target node: sources of node v are
+            # _csc_src[_csc_ptr[v]:_csc_ptr[v + 1]]
+            src, dst = data.edge_index.cpu()
+            self._csc_src = src[torch.argsort(dst, stable=True)]
+            self._csc_ptr = torch.zeros(data.num_nodes + 1, dtype=torch.long)
+            self._csc_ptr[1:] = torch.cumsum(torch.bincount(dst, minlength=data.num_nodes), 0)
+    
+    def _in_edges(self, nodes: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """(sources, targets) of every edge into nodes, read from the CSC arrays"""
+        start = self._csc_ptr[nodes]
+        counts = self._csc_ptr[nodes + 1] - start
+        targets = torch.repeat_interleave(nodes, counts)
+        offsets = torch.arange(int(counts.sum())) - torch.repeat_interleave(torch.cumsum(counts, 0) - counts, counts)
+        return self._csc_src[torch.repeat_interleave(start, counts) + offsets], targets
+    
+    def _k_hop_neighbourhood(self, node_idx: torch.Tensor) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Exact num_layers-hop subgraph around node_idx (unique, CPU), touching only the
+        edges of nodes it reaches. Returns (subset, relabelled edge_index) with node_idx
+        first in subset, so their outputs are the first len(node_idx) rows.
+        """
+        if self._csc_ptr is None:
+            self._build_inference_index()
+        subset = frontier = node_idx
+        for _ in range(self.config.num_layers):
+            sources, _ = self._in_edges(frontier)
+            frontier = torch.unique(sources)
+            frontier = frontier[~torch.isin(frontier, subset)]
+            if frontier.numel() == 0:
+                break
+            subset = torch.cat([subset, frontier])
+        
+        # Induced edges: in-edges of the subset whose source is also in it
+        sorted_subset, order = torch.sort(subset)
+        sources, targets = self._in_edges(sorted_subset)
+        pos = torch.searchsorted(sorted_subset, sources).clamp(max=subset.numel() - 1)
+        keep = sorted_subset[pos] == sources
+        local_target = order[torch.searchsorted(sorted_subset, targets[keep])]
+        edge_index = torch.stack([order[pos[keep]], local_target])
+        return subset, edge_index
+    
+    def _query_embeddings(self, node_idx: torch.Tensor) -> torch.Tensor:
+        """
+        Gene-trait embeddings for the unique node_idx, one row per node in node_idx order,
+        computed from the nodes' neighbourhoods instead of the whole graph. Uses the
+        prebuilt NeighborSampler when a sampling backend is installed, otherwise the exact
+        num_layers-hop subgraph.
+        """
+        forward = self._gene_trait_forward if self._gene_trait_forward is not None else self.gene_trait_model
+        node_idx = node_idx.cpu()
+        
+        if NEIGHBOR_SAMPLING_AVAILABLE:
+            if self._neighbor_sampler is None:
+                self._build_inference_index()
+            loader = NeighborLoader(self._sampling_data, num_neighbors=self.config.num_neighbors,
+                                    input_nodes=node_idx, batch_size=self.config.inference_batch_size,
+                                    neighbor_sampler=self._neighbor_sampler)
+            outputs = []
+            for batch in loader:
+                batch = batch.to(self.device)
+                # Seed nodes come first in each sampled batch, in input order
+                outputs.append(forward(batch.x, batch.edge_index)[:batch.batch_size])
+            return torch.cat(outputs)
+        
+        subset, edge_index = self._k_hop_neighbourhood(node_idx)
+        x = self.graph_data.x[subset.to(self.device)]
+        return forward(x, edge_index.to(self.device))[:node_idx.numel()]
+    
+    def _inference_context(self) -> ExitStack:
+        """inference_mode, plus bfloat16 autocast when running on CUDA"""
+        stack = ExitStack()
+        stack.enter_context(torch.inference_mode())
+        if self.device.type == 'cuda' and self.config.inference_autocast:
+            stack.enter_context(torch.autocast(device_type='cuda', dtype=torch.bfloat16))
+        return stack
+    
     def _get_node_index(self, node_id: str) -> Optional[int]:
         """Get node index from identifier"""
-        if self.node_mappings is None:
-            return None
-
-        # Search through the idx_to_node mapping
-        for idx, identifier in self.node_mappings['idx_to_node'].items():
-            if identifier == node_id:
-                return idx
-
-        return None
+        return self.identifier_to_idx.get(node_id)
     
     def save_models(self, model_dir: str) -> None:
         """Save trained models"""
@@ -513,7 +694,7 @@ def main():
     """Example usage of GNN inference system"""
     logger.info("Graph Neural Network Inference System - Production Ready")
     logger.info("Key features:")
-    logger.info("- Gene-trait association prediction using GCN")
+    logger.info("- Gene-trait association prediction using GraphSAGE")
     logger.info("- Genotype × Environment interaction modeling with GAT")
     logger.info("- Candidate gene identification using GraphSAGE")
     logger.info("- Scalable training with early stopping")
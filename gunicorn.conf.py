@@ -0,0 +1,10 @@
+"""
+Gunicorn settings for the Breeder Dashboard
+
+    gunicorn -c gunicorn.conf.py breeder_dashboard:app
+"""
+
+def post_fork(server, worker):
+    """Warm each worker after the fork, so it also happens under --preload"""
+    import breeder_dashboard
+    breeder_dashboard.init_app()
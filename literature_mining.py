@@ -6,10 +6,51 @@ This script demonstrates how to use LLMs to extract structured data
 from scientific literature for building knowledge graphs.
 """
 
+import asyncio
+import hashlib
+import inspect
 import json
 import csv
 import os
-from typing import List, Dict, Any
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Dict, Any, Tuple, Callable, Sequence, Optional, Mapping
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+try:
+    import faiss
+    import numpy as np
+    from sentence_transformers import SentenceTransformer
+    SEMANTIC_CACHE_AVAILABLE = True
+except ImportError:
+    SEMANTIC_CACHE_AVAILABLE = False
+
+# Maximum extraction calls in flight at once (bounds load on an LLM API)
+EXTRACTION_CONCURRENCY = 8
+
+# Extraction response cache, keyed by sha256(model id + prompt)
+SIMULATED_MODEL_ID = 'simulated'
+LLM_MODEL_ID = os.getenv('LLM_MODEL_ID', SIMULATED_MODEL_ID)
+LLM_CACHE_DIR = os.getenv('LLM_CACHE_DIR', '.llm_cache')
+LLM_CACHE_TTL_SECONDS = int(os.getenv('LLM_CACHE_TTL_SECONDS', 30 * 24 * 3600))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv('LLM_CACHE_MAX_ENTRIES', 1024))
+# Bytes the on-disk cache may hold before diskcache culls least recently stored entries
+LLM_CACHE_SIZE_LIMIT = int(os.getenv('LLM_CACHE_SIZE_LIMIT', 256 * 1024 * 1024))
+
+# Semantic cache: reuse extractions of near-duplicate (paraphrased) abstracts
+SEMANTIC_CACHE_MODEL = 'sentence-transformers/all-MiniLM-L6-v2'
+SEMANTIC_CACHE_THRESHOLD = 0.92
+# Opt-in: the FAISS index is in-process only, so it pays off for long-lived callers
+# feeding abstracts sequentially, not for one batch run of main()
+SEMANTIC_CACHE_ENABLED = os.getenv('LLM_SEMANTIC_CACHE', '').lower() in ('1', 'true', 'yes')
+# Subjects of these predicates are genes; a semantic hit must mention all of them
+GENE_PREDICATES = frozenset({'regulates', 'participates_in', 'has_marker'})
 
 # Example abstracts from real maize genetics papers
 EXAMPLE_ABSTRACTS = [
@@ -50,102 +91,257 @@ EXAMPLE_ABSTRACTS = [
     """
 ]
 
+# Instructions shared by every extraction call. Kept separate from the abstract so
+# providers can cache it as a prompt prefix (system message / cache_control).
+EXTRACTION_SYSTEM_PROMPT = """
+Extract structured biological relationships from this maize genetics abstract.
+Return ONLY a JSON list of relationships in this exact format:
+
+[
+    {"subject": "gene_name", "predicate": "regulates", "object": "trait_name"},
+    {"subject": "genotype_name", "predicate": "has_trait", "object": "trait_name"},
+    {"subject": "trait_name", "predicate": "associated_with", "object": "qtl_name"},
+    {"subject": "qtl_name", "predicate": "located_on", "object": "chromosome_name"},
+    {"subject": "gene_name", "predicate": "participates_in", "object": "pathway_name"},
+    {"subject": "gene_name", "predicate": "has_marker", "object": "marker_name"},
+    {"subject": "genotype_name", "predicate": "tested_in", "object": "trial_name"},
+    {"subject": "trial_name", "predicate": "conducted_in", "object": "location_name"}
+]
+
+Rules:
+- Use exact gene names (e.g., DREB2A, ZmVPP1)
+- Use descriptive trait names (e.g., "Drought Tolerance", "Cold Tolerance")
+- Use standard genotype names (e.g., B73, Mo17, W22)
+- Use QTL format like qDT1.1, qCT2.1
+- Use "Chromosome X" format for chromosomes
+- Include pathway names if mentioned
+- Include marker names if mentioned
+- Only extract relationships explicitly stated in the text
+"""
+
+# Fixed text around the abstract, built once at import; bytes forms skip re-encoding it
+_USER_PROMPT_PREFIX = "Abstract:\n"
+_USER_PROMPT_SUFFIX = "\n\nJSON:"
+_PROMPT_PREFIX = EXTRACTION_SYSTEM_PROMPT + "\n" + _USER_PROMPT_PREFIX
+_PROMPT_PREFIX_BYTES = _PROMPT_PREFIX.encode('utf-8')
+_PROMPT_SUFFIX_BYTES = _USER_PROMPT_SUFFIX.encode('utf-8')
+
+def extraction_user_prompt(abstract: str) -> str:
+    """Per-abstract part of the prompt; always sent after EXTRACTION_SYSTEM_PROMPT"""
+    return "".join((_USER_PROMPT_PREFIX, abstract, _USER_PROMPT_SUFFIX))
+
+def extraction_messages(abstract: str) -> List[Dict[str, str]]:
+    """Chat messages for an LLM API: the static system prompt, then the abstract"""
+    return [
+        {"role": "system", "content": EXTRACTION_SYSTEM_PROMPT},
+        {"role": "user", "content": extraction_user_prompt(abstract)}
+    ]
+
 def extract_relationships_with_llm_prompt(abstract: str) -> str:
     """
     Create a prompt for LLM to extract structured relationships from abstract
     """
-    prompt = f"""
-    Extract structured biological relationships from this maize genetics abstract.
-    Return ONLY a JSON list of relationships in this exact format:
-    
-    [
-        {{"subject": "gene_name", "predicate": "regulates", "object": "trait_name"}},
-        {{"subject": "genotype_name", "predicate": "has_trait", "object": "trait_name"}},
-        {{"subject": "trait_name", "predicate": "associated_with", "object": "qtl_name"}},
-        {{"subject": "qtl_name", "predicate": "located_on", "object": "chromosome_name"}},
-        {{"subject": "gene_name", "predicate": "participates_in", "object": "pathway_name"}},
-        {{"subject": "gene_name", "predicate": "has_marker", "object": "marker_name"}},
-        {{"subject": "genotype_name", "predicate": "tested_in", "object": "trial_name"}},
-        {{"subject": "trial_name", "predicate": "conducted_in", "object": "location_name"}}
-    ]
+    return "".join((_PROMPT_PREFIX, abstract, _USER_PROMPT_SUFFIX))
+
+def extraction_prompt_bytes(abstract: str) -> bytes:
+    """UTF-8 encoded extract_relationships_with_llm_prompt(abstract), for HTTP bodies and hashing"""
+    return b"".join((_PROMPT_PREFIX_BYTES, abstract.encode('utf-8'), _PROMPT_SUFFIX_BYTES))
+
+# Relationships the simulated LLM "extracts", keyed by the gene that marks each abstract.
+# Checked in insertion order; the first marker found in the abstract wins. Rows are
+# read-only views, since every caller and ExtractionCache share the same objects.
+SIMULATED_EXTRACTIONS: Mapping[str, Tuple[Mapping[str, str], ...]] = MappingProxyType({
+    "DREB2A": (
+        MappingProxyType({"subject": "DREB2A", "predicate": "regulates", "object": "Drought Tolerance"}),
+        MappingProxyType({"subject": "B73", "predicate": "has_trait", "object": "Drought Tolerance"}),
+        MappingProxyType({"subject": "Drought Tolerance", "predicate": "associated_with", "object": "qDT1.1"}),
+        MappingProxyType({"subject": "qDT1.1", "predicate": "located_on", "object": "Chromosome 1"}),
+        MappingProxyType({"subject": "B73", "predicate": "tested_in", "object": "Trial_Nebraska_2020"}),
+        MappingProxyType({"subject": "Trial_Nebraska_2020", "predicate": "conducted_in", "object": "Nebraska"}),
+    ),
+    "ZmVPP1": (
+        MappingProxyType({"subject": "ZmVPP1", "predicate": "regulates", "object": "Drought Tolerance"}),
+        MappingProxyType({"subject": "ZmVPP1", "predicate": "participates_in", "object": "ABA Signaling Pathway"}),
+        MappingProxyType({"subject": "ZmVPP1", "predicate": "has_marker", "object": "SNP_chr1_1234567"}),
+        MappingProxyType({"subject": "Mo17", "predicate": "has_trait", "object": "Drought Tolerance"}),
+    ),
+    "ZmDREB1A": (
+        MappingProxyType({"subject": "ZmDREB1A", "predicate": "regulates", "object": "Cold Tolerance"}),
+        MappingProxyType({"subject": "ZmDREB1A", "predicate": "participates_in", "object": "Cold Response Pathway"}),
+        MappingProxyType({"subject": "Cold Tolerance", "predicate": "associated_with", "object": "qCT2.1"}),
+        MappingProxyType({"subject": "qCT2.1", "predicate": "located_on", "object": "Chromosome 2"}),
+        MappingProxyType({"subject": "W22", "predicate": "has_trait", "object": "Cold Tolerance"}),
+        MappingProxyType({"subject": "W22", "predicate": "has_trait", "object": "Early Flowering"}),
+    ),
+    "ZmNF-YB2": (
+        MappingProxyType({"subject": "ZmNF-YB2", "predicate": "regulates", "object": "Nitrogen Use Efficiency"}),
+        MappingProxyType({"subject": "ZmNF-YB2", "predicate": "participates_in", "object": "Nitrogen Metabolism"}),
+        MappingProxyType({"subject": "Nitrogen Use Efficiency", "predicate": "associated_with", "object": "qNUE3.1"}),
+        MappingProxyType({"subject": "qNUE3.1", "predicate": "located_on", "object": "Chromosome 3"}),
+        MappingProxyType({"subject": "SSR_phi003", "predicate": "linked_to", "object": "qNUE3.1"}),
+        MappingProxyType({"subject": "A632", "predicate": "has_trait", "object": "Nitrogen Use Efficiency"}),
+    ),
+    "ZmMYB31": (
+        MappingProxyType({"subject": "ZmMYB31", "predicate": "regulates", "object": "Anthocyanin Production"}),
+        MappingProxyType({"subject": "ZmMYB31", "predicate": "participates_in", "object": "Anthocyanin Biosynthesis"}),
+        MappingProxyType({"subject": "Ki3", "predicate": "has_trait", "object": "Anthocyanin Production"}),
+        MappingProxyType({"subject": "Ki3", "predicate": "has_trait", "object": "Purple Kernels"}),
+        MappingProxyType({"subject": "Anthocyanin Production", "predicate": "associated_with", "object": "qAC8.1"}),
+        MappingProxyType({"subject": "qAC8.1", "predicate": "located_on", "object": "Chromosome 8"}),
+    ),
+})
+
+def simulate_llm_extraction(abstract: str) -> Tuple[Mapping[str, str], ...]:
+    """
+    Simulate LLM extraction - in practice, you'd call an actual LLM API here
+    This function looks up pre-written relationships to show the expected format
+    """
+    for marker, relationships in SIMULATED_EXTRACTIONS.items():
+        if marker in abstract:
+            return relationships
+    return ()
+
+class ExtractionCache:
+    """
+    Cache of extracted relationships keyed by sha256(model id + prompt). Keeps recent
+    entries in process and persists them with diskcache when it is installed. The
+    simulated extractor is only cached in process, so edits to SIMULATED_EXTRACTIONS
+    show up on the next run instead of being masked by stale disk entries.
+    """
+    
+    def __init__(self, model_id: str = LLM_MODEL_ID, directory: Optional[str] = LLM_CACHE_DIR,
+                 ttl: int = LLM_CACHE_TTL_SECONDS, max_entries: int = LLM_CACHE_MAX_ENTRIES,
+                 size_limit: int = LLM_CACHE_SIZE_LIMIT):
+        self.model_id = model_id
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory: Dict[str, Tuple[Dict[str, str], ...]] = {}
+        persist = DISKCACHE_AVAILABLE and directory and model_id != SIMULATED_MODEL_ID
+        self._disk = diskcache.Cache(directory, size_limit=size_limit) if persist else None
+    
+    def key(self, abstract: str) -> str:
+        return hashlib.sha256(self.model_id.encode('utf-8') + extraction_prompt_bytes(abstract)).hexdigest()
     
-    Rules:
-    - Use exact gene names (e.g., DREB2A, ZmVPP1)
-    - Use descriptive trait names (e.g., "Drought Tolerance", "Cold Tolerance")
-    - Use standard genotype names (e.g., B73, Mo17, W22)
-    - Use QTL format like qDT1.1, qCT2.1
-    - Use "Chromosome X" format for chromosomes
-    - Include pathway names if mentioned
-    - Include marker names if mentioned
-    - Only extract relationships explicitly stated in the text
+    def get(self, abstract: str) -> Optional[Tuple[Dict[str, str], ...]]:
+        key = self.key(abstract)
+        relationships = self._memory.get(key)
+        if relationships is None and self._disk is not None:
+            value = self._disk.get(key)
+            if value is not None:
+                relationships = tuple(MappingProxyType(rel) for rel in json.loads(value))
+                self._remember(key, relationships)
+        return relationships
     
-    Abstract:
-    {abstract}
+    def set(self, abstract: str, relationships: Sequence[Dict[str, str]]):
+        key = self.key(abstract)
+        self._remember(key, tuple(relationships))
+        if self._disk is not None:
+            self._disk.set(key, json.dumps([dict(rel) for rel in relationships]), expire=self.ttl)
     
-    JSON:
+    def _remember(self, key: str, relationships: Tuple[Dict[str, str], ...]):
+        if len(self._memory) >= self.max_entries and key not in self._memory:
+            # Evict the oldest insertion to stay bounded
+            self._memory.pop(next(iter(self._memory)))
+        self._memory[key] = relationships
+    
+    def close(self):
+        if self._disk is not None:
+            self._disk.close()
+
+class SemanticExtractionCache:
+    """
+    Nearest-neighbour cache over abstract embeddings, in front of an exact ExtractionCache.
+    A lookup reuses the closest earlier abstract's relationships when the cosine similarity
+    is at least `threshold` and the query abstract names every gene in them, so paraphrases
+    hit but abstracts about a different gene with similar wording do not. Entries that
+    name no genes are only reused through the exact cache.
     """
-    return prompt
+    
+    def __init__(self, exact: Optional[ExtractionCache] = None, model_name: str = SEMANTIC_CACHE_MODEL,
+                 threshold: float = SEMANTIC_CACHE_THRESHOLD):
+        self.exact = exact
+        self.threshold = threshold
+        self.encoder = SentenceTransformer(model_name)
+        self.index = faiss.IndexFlatIP(self.encoder.get_sentence_embedding_dimension())
+        self._entries: List[Tuple[Tuple[Dict[str, str], ...], frozenset]] = []
+        # get() and set() embed the same abstract on a miss
+        self._embed = lru_cache(maxsize=256)(self._encode)
+    
+    def _encode(self, abstract: str) -> 'np.ndarray':
+        vector = self.encoder.encode([abstract], normalize_embeddings=True)
+        return np.asarray(vector, dtype=np.float32)
+    
+    def get(self, abstract: str) -> Optional[Tuple[Dict[str, str], ...]]:
+        if self.exact is not None:
+            relationships = self.exact.get(abstract)
+            if relationships is not None:
+                return relationships
+        if self.index.ntotal == 0:
+            return None
+        scores, ids = self.index.search(self._embed(abstract), 1)
+        if scores[0, 0] < self.threshold:
+            return None
+        relationships, genes = self._entries[ids[0, 0]]
+        # Without genes to check there is no lexical guard, so only exact hits count
+        if not genes or not all(gene in abstract for gene in genes):
+            return None
+        return relationships
+    
+    def set(self, abstract: str, relationships: Sequence[Dict[str, str]]):
+        relationships = tuple(relationships)
+        if self.exact is not None:
+            self.exact.set(abstract, relationships)
+        genes = frozenset(rel['subject'] for rel in relationships if rel['predicate'] in GENE_PREDICATES)
+        self.index.add(self._embed(abstract))
+        self._entries.append((relationships, genes))
+    
+    def close(self):
+        if self.exact is not None:
+            self.exact.close()
 
-def simulate_llm_extraction(abstract: str) -> List[Dict[str, str]]:
+async def extract_one(abstract: str, extractor: Callable, sem: asyncio.Semaphore,
+                      cache=None) -> Sequence[Dict[str, str]]:
+    """Run one extraction under the semaphore; sync extractors run in a worker thread"""
+    if cache is not None:
+        cached = cache.get(abstract)
+        if cached is not None:
+            return cached
+    async with sem:
+        # Also covers client adapters whose async behaviour is on __call__
+        if inspect.iscoroutinefunction(extractor) or inspect.iscoroutinefunction(getattr(extractor, '__call__', None)):
+            relationships = await extractor(abstract)
+        else:
+            relationships = await asyncio.to_thread(extractor, abstract)
+            # Any other callable returning an awaitable (e.g. a wrapped coroutine function)
+            if inspect.isawaitable(relationships):
+                relationships = await relationships
+    if cache is not None:
+        cache.set(abstract, relationships)
+    return relationships
+
+async def extract_many(abstracts: List[str], extractor: Callable = simulate_llm_extraction,
+                       concurrency: int = EXTRACTION_CONCURRENCY,
+                       cache=None) -> List[Sequence[Dict[str, str]]]:
     """
-    Simulate LLM extraction - in practice, you'd call an actual LLM API here
-    This function manually extracts relationships to show the expected format
-    """
-    # This simulates what an LLM would extract from each abstract
-    if "DREB2A" in abstract:
-        return [
-            {"subject": "DREB2A", "predicate": "regulates", "object": "Drought Tolerance"},
-            {"subject": "B73", "predicate": "has_trait", "object": "Drought Tolerance"},
-            {"subject": "Drought Tolerance", "predicate": "associated_with", "object": "qDT1.1"},
-            {"subject": "qDT1.1", "predicate": "located_on", "object": "Chromosome 1"},
-            {"subject": "B73", "predicate": "tested_in", "object": "Trial_Nebraska_2020"},
-            {"subject": "Trial_Nebraska_2020", "predicate": "conducted_in", "object": "Nebraska"}
-        ]
-    elif "ZmVPP1" in abstract:
-        return [
-            {"subject": "ZmVPP1", "predicate": "regulates", "object": "Drought Tolerance"},
-            {"subject": "ZmVPP1", "predicate": "participates_in", "object": "ABA Signaling Pathway"},
-            {"subject": "ZmVPP1", "predicate": "has_marker", "object": "SNP_chr1_1234567"},
-            {"subject": "Mo17", "predicate": "has_trait", "object": "Drought Tolerance"}
-        ]
-    elif "ZmDREB1A" in abstract:
-        return [
-            {"subject": "ZmDREB1A", "predicate": "regulates", "object": "Cold Tolerance"},
-            {"subject": "ZmDREB1A", "predicate": "participates_in", "object": "Cold Response Pathway"},
-            {"subject": "Cold Tolerance", "predicate": "associated_with", "object": "qCT2.1"},
-            {"subject": "qCT2.1", "predicate": "located_on", "object": "Chromosome 2"},
-            {"subject": "W22", "predicate": "has_trait", "object": "Cold Tolerance"},
-            {"subject": "W22", "predicate": "has_trait", "object": "Early Flowering"}
-        ]
-    elif "ZmNF-YB2" in abstract:
-        return [
-            {"subject": "ZmNF-YB2", "predicate": "regulates", "object": "Nitrogen Use Efficiency"},
-            {"subject": "ZmNF-YB2", "predicate": "participates_in", "object": "Nitrogen Metabolism"},
-            {"subject": "Nitrogen Use Efficiency", "predicate": "associated_with", "object": "qNUE3.1"},
-            {"subject": "qNUE3.1", "predicate": "located_on", "object": "Chromosome 3"},
-            {"subject": "SSR_phi003", "predicate": "linked_to", "object": "qNUE3.1"},
-            {"subject": "A632", "predicate": "has_trait", "object": "Nitrogen Use Efficiency"}
-        ]
-    elif "ZmMYB31" in abstract:
-        return [
-            {"subject": "ZmMYB31", "predicate": "regulates", "object": "Anthocyanin Production"},
-            {"subject": "ZmMYB31", "predicate": "participates_in", "object": "Anthocyanin Biosynthesis"},
-            {"subject": "Ki3", "predicate": "has_trait", "object": "Anthocyanin Production"},
-            {"subject": "Ki3", "predicate": "has_trait", "object": "Purple Kernels"},
-            {"subject": "Anthocyanin Production", "predicate": "associated_with", "object": "qAC8.1"},
-            {"subject": "qAC8.1", "predicate": "located_on", "object": "Chromosome 8"}
-        ]
-    else:
-        return []
+    Extract relationships from all abstracts concurrently, at most `concurrency` at a time.
+    extractor maps an abstract to its relationships and may be sync or async, so an
+    async LLM client can replace simulate_llm_extraction without changing the pipeline.
+    Abstracts found in cache (an ExtractionCache or SemanticExtractionCache) skip the
+    extractor. Results are returned in input order.
+    """
+    sem = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(*(extract_one(abstract, extractor, sem, cache) for abstract in abstracts))
+
+# Output buffer for relationship CSVs
+CSV_BUFFER_SIZE = 1 << 20
 
 def save_relationships_to_csv(relationships: List[Dict[str, str]], filename: str):
     """Save extracted relationships to CSV file"""
-    with open(filename, 'w', newline='') as csvfile:
-        fieldnames = ['subject', 'predicate', 'object']
-        writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-        writer.writeheader()
-        for rel in relationships:
-            writer.writerow(rel)
+    rows = [(rel['subject'], rel['predicate'], rel['object']) for rel in relationships]
+    with open(filename, 'w', newline='', buffering=CSV_BUFFER_SIZE) as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(('subject', 'predicate', 'object'))
+        writer.writerows(rows)
 
 def main():
     """Main function to demonstrate literature mining"""
@@ -153,7 +349,16 @@ def main():
     
     all_relationships = []
     
-    for i, abstract in enumerate(EXAMPLE_ABSTRACTS, 1):
+    # Simulated LLM extraction (pass an LLM API client's extract function to use a real model)
+    cache = ExtractionCache()
+    if SEMANTIC_CACHE_ENABLED and SEMANTIC_CACHE_AVAILABLE:
+        cache = SemanticExtractionCache(cache)
+    try:
+        extracted = asyncio.run(extract_many(EXAMPLE_ABSTRACTS, cache=cache))
+    finally:
+        cache.close()
+    
+    for i, (abstract, relationships) in enumerate(zip(EXAMPLE_ABSTRACTS, extracted), 1):
         print(f"Processing Abstract {i}:")
         print(f"Preview: {abstract[:100]}...")
         
@@ -161,9 +366,6 @@ def main():
         prompt = extract_relationships_with_llm_prompt(abstract)
         print(f"\nLLM Prompt length: {len(prompt)} characters")
         
-        # Simulate LLM extraction (replace with actual LLM API call)
-        relationships = simulate_llm_extraction(abstract)
-        
         print(f"Extracted {len(relationships)} relationships:")
         for rel in relationships:
             print(f"  {rel['subject']} --[{rel['predicate']}]--> {rel['object']}")
@@ -180,10 +382,7 @@ def main():
     print(f"Saved to: {output_file}")
     
     # Show statistics
-    predicates = {}
-    for rel in all_relationships:
-        pred = rel['predicate']
-        predicates[pred] = predicates.get(pred, 0) + 1
+    predicates = Counter(rel['predicate'] for rel in all_relationships)
     
     print(f"\nRelationship types:")
     for pred, count in sorted(predicates.items()):
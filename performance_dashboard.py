@@ -5,11 +5,31 @@ Performance Dashboard for Knowledge Graph
 Simple visualization of key performance metrics
 """
 
+import atexit
+import hashlib
 import os
+import shutil
 from neo4j import GraphDatabase
+from neo4j.exceptions import ClientError
 from dotenv import load_dotenv
-import matplotlib.pyplot as plt
+import matplotlib
+# Render off-screen; the dashboard is written to a PNG
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
 import numpy as np
+from dashboard_cache import InMemoryCache
+
+# Metrics reused by repeat dashboard renders within this many seconds
+METRICS_TTL = 30
+_METRICS_CACHE = InMemoryCache(max_entries=4)
+
+DASHBOARD_PATH = 'performance_dashboard.png'
+# Rendered dashboards keyed by a hash of the counts they show
+DASHBOARD_RENDER_DIR = '.dashboard_renders'
+# Part of the render key; bump it whenever the plotting code changes
+DASHBOARD_RENDER_VERSION = 1
+# Most recently used renders kept in DASHBOARD_RENDER_DIR
+DASHBOARD_RENDER_KEEP = 4
 
 def connect_to_neo4j():
     """Connect to Neo4j database"""
@@ -21,41 +41,151 @@ def connect_to_neo4j():
     
     return GraphDatabase.driver(
         NEO4J_URI, 
-        auth=(NEO4J_USERNAME, NEO4J_PASSWORD)
+        auth=(NEO4J_USERNAME, NEO4J_PASSWORD),
+        max_connection_pool_size=16,
+        connection_acquisition_timeout=30.0
     )
 
+# Shared driver; its connection pool is reused across menu choices
+_DRIVER = None
+
+def get_driver():
+    """Return the shared Neo4j driver, connecting on first use"""
+    global _DRIVER
+    if _DRIVER is None:
+        _DRIVER = connect_to_neo4j()
+        atexit.register(_DRIVER.close)
+    return _DRIVER
+
+# Per-label and per-type counts straight from the count store (needs APOC)
+APOC_STATS_QUERY = "CALL apoc.meta.stats() YIELD labels, relTypesCount RETURN labels, relTypesCount"
+
+# Set after the first metrics call: whether apoc.meta.stats() can be used
+_APOC_AVAILABLE = None
+
+def count_store_query(labels, rel_types):
+    """One query counting each label and relationship type; label- and type-scoped counts use the count store"""
+    labels = [label.replace('`', '``') for label in labels]
+    rel_types = [rel_type.replace('`', '``') for rel_type in rel_types]
+    subqueries = [
+        f"CALL {{ MATCH (n:`{label}`) RETURN count(n) as node_{i} }}" for i, label in enumerate(labels)
+    ] + [
+        f"CALL {{ MATCH ()-[r:`{rel_type}`]->() RETURN count(r) as rel_{i} }}" for i, rel_type in enumerate(rel_types)
+    ]
+    columns = [f"node_{i}" for i in range(len(labels))] + [f"rel_{i}" for i in range(len(rel_types))]
+    return "\n".join(subqueries) + "\nRETURN " + (", ".join(columns) or "0 as empty")
+
+def _by_count(counts):
+    """Non-zero counts, largest first"""
+    return dict(sorted(((k, v) for k, v in counts.items() if v > 0), key=lambda item: item[1], reverse=True))
+
+# Coverage metric name -> (result column, subquery returning total and covered)
+COVERAGE_QUERIES = {
+    'Genes with Traits': ('genes_with_traits', """
+        MATCH (g:Gene) 
+        OPTIONAL MATCH (g)-[:REGULATES]->(t:Trait)
+        RETURN {total: count(g), covered: count(t)} as genes_with_traits
+    """),
+    'Traits with QTLs': ('traits_with_qtls', """
+        MATCH (t:Trait) 
+        OPTIONAL MATCH (t)-[:ASSOCIATED_WITH]->(q:QTL)
+        RETURN {total: count(t), covered: count(q)} as traits_with_qtls
+    """),
+    'Genotypes with Trials': ('genotypes_with_trials', """
+        MATCH (g:Genotype) 
+        OPTIONAL MATCH (g)-[:TESTED_IN]->(t:Trial)
+        RETURN {total: count(g), covered: count(t)} as genotypes_with_trials
+    """)
+}
+
+# Graph totals plus every coverage metric, in one round trip
+SUMMARY_QUERY = (
+    "CALL { MATCH (n) RETURN count(n) as total_nodes }\n"
+    "CALL { MATCH ()-[r]->() RETURN count(r) as total_rels }\n"
+    + "".join(f"CALL {{{query}}}\n" for _, query in COVERAGE_QUERIES.values())
+    + "RETURN total_nodes, total_rels, "
+    + ", ".join(column for column, _ in COVERAGE_QUERIES.values())
+)
+
 def get_basic_metrics(driver):
     """Get basic graph metrics"""
+    global _APOC_AVAILABLE
     with driver.session() as session:
-        # Node counts
-        node_query = """
-        MATCH (n) RETURN labels(n) as type, count(n) as count
-        ORDER BY count DESC
-        """
-        result = session.run(node_query)
-        node_counts = {record['type'][0]: record['count'] for record in result}
+        if _APOC_AVAILABLE is not False:
+            try:
+                record = session.run(APOC_STATS_QUERY).single()
+                _APOC_AVAILABLE = True
+                return _by_count(record['labels']), _by_count(record['relTypesCount'])
+            except ClientError:
+                # Procedure not installed; fall back to per-label counts
+                _APOC_AVAILABLE = False
         
-        # Relationship counts
-        rel_query = """
-        MATCH ()-[r]->() RETURN type(r) as rel_type, count(r) as count
-        ORDER BY count DESC
-        """
-        result = session.run(rel_query)
-        rel_counts = {record['rel_type']: record['count'] for record in result}
+        labels = [record['label'] for record in session.run("CALL db.labels() YIELD label RETURN label")]
+        rel_types = [record['relationshipType'] for record in
+                     session.run("CALL db.relationshipTypes() YIELD relationshipType RETURN relationshipType")]
+        record = session.run(count_store_query(labels, rel_types)).single()
+        node_counts = {label: record[f"node_{i}"] for i, label in enumerate(labels)}
+        rel_counts = {rel_type: record[f"rel_{i}"] for i, rel_type in enumerate(rel_types)}
         
-        return node_counts, rel_counts
+        return _by_count(node_counts), _by_count(rel_counts)
+
+def get_cached_metrics(driver):
+    """get_basic_metrics, reused for METRICS_TTL seconds"""
+    metrics = _METRICS_CACHE.get('basic_metrics')
+    if metrics is None:
+        metrics = get_basic_metrics(driver)
+        _METRICS_CACHE.set('basic_metrics', metrics, ttl=METRICS_TTL)
+    return metrics
+
+def dashboard_render_path(node_counts, rel_counts):
+    """Cached render location for a dashboard showing these counts"""
+    payload = repr((DASHBOARD_RENDER_VERSION,
+                    tuple(sorted(node_counts.items())), tuple(sorted(rel_counts.items()))))
+    digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+    return os.path.join(DASHBOARD_RENDER_DIR, f"performance_dashboard_{digest}.png")
+
+def prune_dashboard_renders(keep=DASHBOARD_RENDER_KEEP):
+    """Delete all but the `keep` most recently used renders"""
+    renders = [entry for entry in os.scandir(DASHBOARD_RENDER_DIR)
+               if entry.name.startswith('performance_dashboard_') and entry.name.endswith('.png')]
+    renders.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in renders[keep:]:
+        os.remove(entry.path)
+
+# Dashboard figure, created on first render and cleared for later ones
+_DASHBOARD_FIGURE = None
+
+def dashboard_figure():
+    """Return the dashboard Figure and its 2x2 axes, cleared for a new render"""
+    global _DASHBOARD_FIGURE
+    if _DASHBOARD_FIGURE is None:
+        fig = Figure(figsize=(15, 12))
+        _DASHBOARD_FIGURE = fig, fig.subplots(2, 2)
+    else:
+        for ax in _DASHBOARD_FIGURE[1].flat:
+            ax.clear()
+    return _DASHBOARD_FIGURE
 
 def create_performance_dashboard():
-    """Create and display performance dashboard"""
+    """Create the performance dashboard and save it as a PNG"""
     print("📊 Creating Performance Dashboard...")
     
-    driver = connect_to_neo4j()
+    driver = get_driver()
     
     try:
-        node_counts, rel_counts = get_basic_metrics(driver)
+        node_counts, rel_counts = get_cached_metrics(driver)
+        
+        # Same counts render the same figure; reuse it
+        render_path = dashboard_render_path(node_counts, rel_counts)
+        if os.path.exists(render_path):
+            # Mark as recently used so pruning keeps it
+            os.utime(render_path)
+            shutil.copyfile(render_path, DASHBOARD_PATH)
+            print(f"✅ Dashboard saved as '{DASHBOARD_PATH}' (unchanged since last render)")
+            return
         
         # Create figure with subplots
-        fig, ((ax1, ax2), (ax3, ax4)) = plt.subplots(2, 2, figsize=(15, 12))
+        fig, ((ax1, ax2), (ax3, ax4)) = dashboard_figure()
         fig.suptitle('Knowledge Graph Performance Dashboard', fontsize=16, fontweight='bold')
         
         # 1. Node Distribution
@@ -112,20 +242,17 @@ def create_performance_dashboard():
             ax4.text(bar.get_x() + bar.get_width()/2., height + 1,
                     f'{value:.1f}%', ha='center', va='bottom')
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         # Save the dashboard
-        plt.savefig('performance_dashboard.png', dpi=300, bbox_inches='tight')
-        print("✅ Dashboard saved as 'performance_dashboard.png'")
-        
-        # Display the dashboard
-        plt.show()
+        os.makedirs(DASHBOARD_RENDER_DIR, exist_ok=True)
+        fig.savefig(render_path, dpi=300, bbox_inches='tight')
+        prune_dashboard_renders()
+        shutil.copyfile(render_path, DASHBOARD_PATH)
+        print(f"✅ Dashboard saved as '{DASHBOARD_PATH}'")
         
     except Exception as e:
         print(f"❌ Error creating dashboard: {e}")
-    
-    finally:
-        driver.close()
 
 def print_performance_summary():
     """Print a text-based performance summary"""
@@ -133,37 +260,14 @@ def print_performance_summary():
     print("📊 KNOWLEDGE GRAPH PERFORMANCE SUMMARY")
     print("="*60)
     
-    driver = connect_to_neo4j()
+    driver = get_driver()
     
     try:
         with driver.session() as session:
-            # Basic counts
-            node_query = "MATCH (n) RETURN count(n) as count"
-            result = session.run(node_query)
-            total_nodes = result.single()['count']
-            
-            rel_query = "MATCH ()-[r]->() RETURN count(r) as count"
-            result = session.run(rel_query)
-            total_rels = result.single()['count']
-            
-            # Coverage metrics
-            coverage_queries = {
-                'Genes with Traits': """
-                    MATCH (g:Gene) 
-                    OPTIONAL MATCH (g)-[:REGULATES]->(t:Trait)
-                    RETURN count(g) as total, count(t) as covered
-                """,
-                'Traits with QTLs': """
-                    MATCH (t:Trait) 
-                    OPTIONAL MATCH (t)-[:ASSOCIATED_WITH]->(q:QTL)
-                    RETURN count(t) as total, count(q) as covered
-                """,
-                'Genotypes with Trials': """
-                    MATCH (g:Genotype) 
-                    OPTIONAL MATCH (g)-[:TESTED_IN]->(t:Trial)
-                    RETURN count(g) as total, count(t) as covered
-                """
-            }
+            # Basic counts and coverage metrics
+            summary = session.run(SUMMARY_QUERY).single()
+            total_nodes = summary['total_nodes']
+            total_rels = summary['total_rels']
             
             print(f"🔢 GRAPH SIZE:")
             print(f"   • Total Nodes: {total_nodes:,}")
@@ -171,9 +275,8 @@ def print_performance_summary():
             print(f"   • Graph Density: {total_rels/(total_nodes*(total_nodes-1)):.6f}")
             
             print(f"\n📈 COVERAGE METRICS:")
-            for metric_name, query in coverage_queries.items():
-                result = session.run(query)
-                record = result.single()
+            for metric_name, (column, _) in COVERAGE_QUERIES.items():
+                record = summary[column]
                 total = record['total']
                 covered = record['covered']
                 coverage_pct = (covered / total * 100) if total > 0 else 0
@@ -192,9 +295,6 @@ def print_performance_summary():
             
     except Exception as e:
         print(f"❌ Error getting performance summary: {e}")
-    
-    finally:
-        driver.close()
 
 def main():
     """Main function"""
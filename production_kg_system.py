@@ -251,29 +251,31 @@ class ProductionKGSystem:
         
         processed_locations = 0
         
-        for location in example_locations:
-            try:
-                # Process environmental profile for location
-                start_date = datetime(2020, 1, 1)
-                end_date = datetime(2023, 12, 31)
-                
-                profile = self.environmental_integrator.process_location(
-                    location['name'],
-                    location['lat'],
-                    location['lon'],
-                    start_date,
-                    end_date
-                )
-                
-                # Integrate into knowledge graph
-                self.environmental_integrator.integrate_environmental_profile(profile)
-                
-                processed_locations += 1
-                logger.info(f"Processed environmental data for {location['name']}")
-                
-            except Exception as e:
-                logger.error(f"Failed to process environmental data for {location['name']}: {e}")
-                continue
+        # Reuse one session for every location's write transaction
+        with self.neo4j_driver.session() as session:
+            for location in example_locations:
+                try:
+                    # Process environmental profile for location
+                    start_date = datetime(2020, 1, 1)
+                    end_date = datetime(2023, 12, 31)
+                    
+                    profile = self.environmental_integrator.process_location(
+                        location['name'],
+                        location['lat'],
+                        location['lon'],
+                        start_date,
+                        end_date
+                    )
+                    
+                    # Integrate into knowledge graph
+                    self.environmental_integrator.integrate_environmental_profile(profile, session=session)
+                    
+                    processed_locations += 1
+                    logger.info(f"Processed environmental data for {location['name']}")
+                    
+                except Exception as e:
+                    logger.error(f"Failed to process environmental data for {location['name']}: {e}")
+                    continue
         
         stats = {'processed_locations': processed_locations}
         logger.info(f"Environmental processing complete: {stats}")
@@ -9,7 +9,7 @@ capable of handling millions of genotypes, real phenotypic data, and complex bre
 import pandas as pd
 import os
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import Enum
 from neo4j import GraphDatabase
 import logging
@@ -108,6 +108,7 @@ class RelationshipSchema:
     to_node: NodeType
     properties: List[str]
     constraints: List[str]
+    indexes: List[str] = field(default_factory=list)
 
 class ProductionSchema:
     """Production-ready schema for biological knowledge graph"""
@@ -127,7 +128,9 @@ class ProductionSchema:
             optional_properties=['description', 'biotype', 'strand', 'ensembl_id', 'ncbi_id', 'uniprot_id'],
             constraints=['CREATE CONSTRAINT gene_id_unique IF NOT EXISTS FOR (g:Gene) REQUIRE g.gene_id IS UNIQUE'],
             indexes=['CREATE INDEX gene_symbol_index IF NOT EXISTS FOR (g:Gene) ON (g.symbol)',
-                    'CREATE INDEX gene_chromosome_index IF NOT EXISTS FOR (g:Gene) ON (g.chromosome)']
+                    'CREATE INDEX gene_chromosome_index IF NOT EXISTS FOR (g:Gene) ON (g.chromosome)',
+                    'CREATE TEXT INDEX gene_name_text IF NOT EXISTS FOR (g:Gene) ON (g.name)',
+                    'CREATE TEXT INDEX gene_symbol_text IF NOT EXISTS FOR (g:Gene) ON (g.symbol)']
         )
         
         # Germplasm node for breeding materials
@@ -170,6 +173,15 @@ class ProductionSchema:
                     'CREATE INDEX environment_year_index IF NOT EXISTS FOR (e:Environment) ON (e.year)']
         )
         
+        # Location node with a WGS-84 point for spatial queries
+        schemas[NodeType.LOCATION] = NodeSchema(
+            node_type=NodeType.LOCATION,
+            required_properties=['location_id', 'name', 'latitude', 'longitude'],
+            optional_properties=['coord', 'elevation', 'country', 'state_province', 'soil_type', 'climate_zone'],
+            constraints=['CREATE CONSTRAINT location_id_unique IF NOT EXISTS FOR (l:Location) REQUIRE l.location_id IS UNIQUE'],
+            indexes=['CREATE POINT INDEX location_coord_point IF NOT EXISTS FOR (l:Location) ON (l.coord)']
+        )
+        
         # Trait node with ontology integration
         schemas[NodeType.TRAIT] = NodeSchema(
             node_type=NodeType.TRAIT,
@@ -177,7 +189,8 @@ class ProductionSchema:
             optional_properties=['description', 'unit', 'method', 'crop_ontology_id', 'heritability'],
             constraints=['CREATE CONSTRAINT trait_id_unique IF NOT EXISTS FOR (t:Trait) REQUIRE t.trait_id IS UNIQUE'],
             indexes=['CREATE INDEX trait_name_index IF NOT EXISTS FOR (t:Trait) ON (t.name)',
-                    'CREATE INDEX trait_category_index IF NOT EXISTS FOR (t:Trait) ON (t.category)']
+                    'CREATE INDEX trait_category_index IF NOT EXISTS FOR (t:Trait) ON (t.category)',
+                    'CREATE TEXT INDEX trait_name_text IF NOT EXISTS FOR (t:Trait) ON (t.name)']
         )
         
         # Measurement node for phenotypic data
@@ -256,6 +269,15 @@ class ProductionSchema:
                         logger.info(f"Created index: {index}")
                     except Exception as e:
                         logger.warning(f"Index may already exist: {e}")
+            
+            # Relationship property indexes (Neo4j 4.3+)
+            for rel_type, schema in self.relationship_schemas.items():
+                for index in schema.indexes:
+                    try:
+                        session.run(index)
+                        logger.info(f"Created index: {index}")
+                    except Exception as e:
+                        logger.warning(f"Relationship index for {rel_type.value} not created: {e}")
     
     def validate_node_data(self, node_type: NodeType, data: Dict[str, Any]) -> bool:
         """Validate node data against schema"""
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Test the Dashboard Response Cache
+
+Checks the in-process TTL cache and cache keys used by the breeder and
+performance dashboards. Needs neither Neo4j nor Redis.
+"""
+
+from unittest import mock
+
+import dashboard_cache
+from dashboard_cache import InMemoryCache, make_key
+
+def test_ttl_expiry():
+    """Entries are served until their TTL passes, then dropped"""
+    print("⏱️  Testing TTL expiry")
+    cache = InMemoryCache()
+    with mock.patch.object(dashboard_cache.time, 'monotonic', return_value=1000.0) as clock:
+        cache.set('k', b'value', ttl=10)
+        clock.return_value = 1009.0
+        assert cache.get('k') == b'value'
+        clock.return_value = 1010.5
+        assert cache.get('k') is None
+        assert 'k' not in cache._entries
+    print("✅ Expired entries are dropped on read")
+
+def test_eviction_at_max_entries():
+    """The oldest insertion is evicted once max_entries is reached"""
+    print("📦 Testing eviction at max_entries")
+    cache = InMemoryCache(max_entries=2)
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    # Overwriting an existing key must not evict anything
+    cache.set('a', b'1b')
+    assert cache.get('a') == b'1b' and cache.get('b') == b'2'
+    cache.set('c', b'3')
+    assert cache.get('a') is None
+    assert cache.get('b') == b'2' and cache.get('c') == b'3'
+    assert len(cache._entries) == 2
+    print("✅ Cache stays bounded at max_entries")
+
+def test_invalidate():
+    """invalidate() drops every entry"""
+    print("🧹 Testing invalidate()")
+    cache = InMemoryCache()
+    cache.set('a', b'1')
+    cache.set('b', b'2')
+    cache.invalidate()
+    assert cache.get('a') is None and cache.get('b') is None
+    print("✅ All entries invalidated")
+
+def test_key_stability():
+    """Keys depend on endpoint and parameters, not on parameter order"""
+    print("🔑 Testing key stability")
+    key = make_key('/api/candidates', {'trait_name': ['Yield'], 'top_k': ['10']})
+    assert key == make_key('/api/candidates', {'top_k': ['10'], 'trait_name': ['Yield']})
+    assert key.startswith(f"{dashboard_cache.KEY_PREFIX}:")
+    assert key != make_key('/api/candidates', {'trait_name': ['Yield'], 'top_k': ['20']})
+    assert key != make_key('/api/performance', {'trait_name': ['Yield'], 'top_k': ['10']})
+    print("✅ Keys are stable across parameter order")
+
+def main():
+    """Run the cache tests"""
+    print("🧬 Dashboard Cache Test (No Neo4j Required)")
+    print("=" * 60)
+
+    test_ttl_expiry()
+    test_eviction_at_max_entries()
+    test_invalidate()
+    test_key_stability()
+
+    print("\n🎉 All cache tests passed!")
+
+if __name__ == "__main__":
+    main()
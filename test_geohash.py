@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Test Geohash Location Keys
+
+geohash_encode produces the persistent location_id keys of Location nodes, so
+it must match the standard geohash exactly. Needs no Neo4j or network access.
+"""
+
+from environmental_integration import geohash_encode, location_key
+
+def test_known_vectors():
+    """Published geohashes for fixed coordinates"""
+    print("🌍 Testing known geohash vectors")
+    assert geohash_encode(57.64911, 10.40744, precision=11) == 'u4pruydqqvj'
+    assert geohash_encode(42.6, -5.6, precision=5) == 'ezs42'
+    assert geohash_encode(0.0, 0.0) == 's0000000'
+    print("✅ Known vectors match")
+
+def test_edges():
+    """The ±90 latitude and ±180 longitude limits map to the corner cells"""
+    print("🧭 Testing coordinate limits")
+    assert geohash_encode(-90.0, -180.0) == '00000000'
+    assert geohash_encode(90.0, 180.0) == 'zzzzzzzz'
+    assert geohash_encode(90.0, -180.0) == 'bpbpbpbp'
+    assert geohash_encode(-90.0, 180.0) == 'pbpbpbpb'
+    print("✅ Limits land in the corner cells")
+
+def test_location_key():
+    """location_id is the prefixed default-precision geohash"""
+    print("🔑 Testing location keys")
+    key = location_key(57.64911, 10.40744)
+    assert key == 'loc_u4pruydq'
+    # Points a few metres apart share a cell
+    assert location_key(57.649111, 10.407441) == key
+    print("✅ Location keys are stable")
+
+def main():
+    """Run the geohash tests"""
+    print("🧬 Geohash Test (No Neo4j Required)")
+    print("=" * 60)
+
+    test_known_vectors()
+    test_edges()
+    test_location_key()
+
+    print("\n🎉 All geohash tests passed!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Test the Database Mining Rate Limiter
+
+Checks TokenBucket refill, burst capacity and back-off on server rate-limit
+headers against a fake clock, so no requests are made and nothing sleeps.
+"""
+
+from contextlib import contextmanager
+from unittest import mock
+
+import database_mining
+from database_mining import TokenBucket
+
+class FakeClock:
+    """Stands in for time.monotonic/time.sleep/time.time; sleeping advances the clock"""
+
+    def __init__(self, start: float = 1000.0, epoch: float = 1_700_000_000.0):
+        self.now = start
+        self.epoch = epoch
+        self.sleeps = []
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.epoch + self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+@contextmanager
+def fake_clock():
+    clock = FakeClock()
+    with mock.patch.object(database_mining.time, 'monotonic', clock.monotonic), \
+         mock.patch.object(database_mining.time, 'time', clock.time), \
+         mock.patch.object(database_mining.time, 'sleep', clock.sleep):
+        yield clock
+
+def test_burst_capacity():
+    """A full bucket hands out `capacity` tokens without waiting, then throttles"""
+    print("🪣 Testing burst capacity")
+    with fake_clock() as clock:
+        bucket = TokenBucket(rate=5.0, capacity=3)
+        for _ in range(3):
+            bucket.acquire()
+        assert clock.sleeps == []
+        bucket.acquire()
+        assert clock.sleeps == [0.2]
+    print("✅ Burst served immediately, then limited to the rate")
+
+def test_refill():
+    """Tokens refill at `rate` per second, capped at capacity"""
+    print("🔁 Testing refill")
+    with fake_clock() as clock:
+        bucket = TokenBucket(rate=2.0, capacity=4)
+        for _ in range(4):
+            bucket.acquire()
+        clock.now += 1.0
+        bucket._refill(clock.now)
+        assert bucket.tokens == 2.0
+        clock.now += 60.0
+        bucket._refill(clock.now)
+        assert bucket.tokens == 4
+    print("✅ Refill follows the rate and stops at capacity")
+
+def test_backoff_on_rate_limit_headers():
+    """An exhausted quota pauses the bucket until the reported reset"""
+    print("⏸️  Testing adaptive back-off")
+    with fake_clock() as clock:
+        bucket = TokenBucket(rate=10.0)
+        bucket.update({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': '5'})
+        bucket.acquire()
+        assert abs(sum(clock.sleeps) - 5.0) < 1e-6
+
+        # Epoch timestamps are converted to a delay
+        clock.sleeps.clear()
+        bucket.update({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': str(clock.time() + 3)})
+        bucket.acquire()
+        assert abs(sum(clock.sleeps) - 3.0) < 1e-6
+
+        # Remaining quota or malformed headers leave the bucket alone
+        clock.sleeps.clear()
+        clock.now += 10.0
+        bucket.update({'X-RateLimit-Remaining': '7', 'X-RateLimit-Reset': '30'})
+        bucket.update({'X-RateLimit-Remaining': '0', 'X-RateLimit-Reset': 'soon'})
+        bucket.acquire()
+        assert clock.sleeps == []
+    print("✅ Bucket pauses until the server's reset time")
+
+def main():
+    """Run the rate limiter tests"""
+    print("🧬 Token Bucket Test (No Network Required)")
+    print("=" * 60)
+
+    test_burst_capacity()
+    test_refill()
+    test_backoff_on_rate_limit_headers()
+
+    print("\n🎉 All rate limiter tests passed!")
+
+if __name__ == "__main__":
+    main()